@@ -0,0 +1,67 @@
+from collections import Counter
+
+from timeseries import TranslationTimeline
+
+
+class GlobalStats:
+    """Totals across all guilds, updated on every recorded translation.
+
+    Keeps the overall total, a reference count per user (the number of
+    guilds they have translated in, so the unique-user count is exact),
+    per-language counts with a small top-k list kept sorted as counts
+    change, and a merged TranslationTimeline for the period views. Reading
+    any of them never walks the per-guild stats.
+    """
+
+    def __init__(self, top_k=5):
+        self.top_k = top_k
+        self.total = 0
+        self.user_guilds = {}
+        self.per_language = Counter()
+        self.timeline = TranslationTimeline()
+        self._top = []
+
+    @classmethod
+    def from_stats(cls, stats_by_guild, top_k=5):
+        aggregates = cls(top_k)
+        aggregates.rebuild(stats_by_guild)
+        return aggregates
+
+    def rebuild(self, stats_by_guild):
+        """Recompute everything from the per-guild stats (startup and /resetstats only)."""
+        self.total = 0
+        self.user_guilds = {}
+        self.per_language = Counter()
+        self.timeline = TranslationTimeline()
+        for guild_stats in stats_by_guild.values():
+            self.total += guild_stats["total"]
+            for user_id in guild_stats["per_user"]:
+                self.user_guilds[user_id] = self.user_guilds.get(user_id, 0) + 1
+            self.per_language.update(guild_stats["per_language"])
+            self.timeline.merge(guild_stats["timeline"])
+        self._top = [lang for lang, _ in self.per_language.most_common(self.top_k)]
+
+    def record(self, user_id, lang, first_in_guild):
+        """Count one translation; first_in_guild is True for a user's first translation in that guild."""
+        self.total += 1
+        if first_in_guild:
+            self.user_guilds[user_id] = self.user_guilds.get(user_id, 0) + 1
+        self.per_language[lang] += 1
+        self.timeline.record(lang)
+
+        # Counts only grow here, so a language can only move up the top list
+        if lang not in self._top:
+            if len(self._top) < self.top_k:
+                self._top.append(lang)
+            elif self.per_language[lang] > self.per_language[self._top[-1]]:
+                self._top[-1] = lang
+            else:
+                return
+        self._top.sort(key=lambda code: self.per_language[code], reverse=True)
+
+    @property
+    def unique_users(self):
+        return len(self.user_guilds)
+
+    def top_languages(self):
+        return [(lang, self.per_language[lang]) for lang in self._top]
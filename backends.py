@@ -0,0 +1,221 @@
+import json
+import logging
+import random
+import re
+import time
+
+from deep_translator import GoogleTranslator
+
+logger = logging.getLogger('discord_translator')
+
+
+class NoBackendAvailable(Exception):
+    """Raised when no registered backend can translate a language pair."""
+
+
+class TranslationBackend:
+    """Base class for translation engines.
+
+    Methods are blocking; the TranslationExecutor runs them on its worker
+    pool. `cost` is a relative price per request used to pick the cheapest
+    backend that supports a language pair.
+    """
+    name = "base"
+    cost = 1.0
+
+    def __init__(self):
+        self.healthy = True
+
+    def supports(self, source, target):
+        return True
+
+    def translate(self, text, source, target):
+        raise NotImplementedError
+
+    def translate_batch(self, texts, source, target):
+        return [self.translate(text, source, target) for text in texts]
+
+    def pack(self, texts):
+        """Group a batch into lists of indices that each take a single request."""
+        return [list(range(len(texts)))]
+
+    def translate_pack(self, texts, source, target):
+        """Translate one group from pack() in one request.
+
+        Returns None if the results can't be matched up with the texts, in
+        which case the caller translates them one at a time.
+        """
+        if len(texts) == 1:
+            return [self.translate(texts[0], source, target)]
+        return self.translate_batch(texts, source, target)
+
+    def health_check(self):
+        """Return True if the backend can currently translate."""
+        return bool(self.translate("hello", "en", "es"))
+
+
+# Texts in a batch are joined into a single request using this separator line
+BATCH_SEPARATOR = "\n§\n"
+BATCH_SEPARATOR_PATTERN = re.compile(r"\s*§\s*")
+BATCH_MAX_CHARS = 4500  # Google rejects requests above 5000 characters
+
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate through deep_translator."""
+    name = "google"
+    cost = 1.0
+
+    def translate(self, text, source, target):
+        return GoogleTranslator(source=source, target=target).translate(text)
+
+    def pack(self, texts):
+        """Pack texts into requests of up to BATCH_MAX_CHARS joined by a separator line.
+
+        Texts that are too long or contain the separator get a request of their own.
+        """
+        packs = []
+        current = []
+        current_chars = 0
+        for index, text in enumerate(texts):
+            packable = "§" not in text and len(text) < BATCH_MAX_CHARS
+            if not packable or current_chars + len(text) + len(BATCH_SEPARATOR) > BATCH_MAX_CHARS:
+                if current:
+                    packs.append(current)
+                current, current_chars = [], 0
+            if not packable:
+                packs.append([index])
+                continue
+            current.append(index)
+            current_chars += len(text) + len(BATCH_SEPARATOR)
+        if current:
+            packs.append(current)
+        return packs
+
+    def translate_pack(self, texts, source, target):
+        if len(texts) == 1:
+            return [self.translate(texts[0], source, target)]
+        translated = GoogleTranslator(source=source, target=target).translate(BATCH_SEPARATOR.join(texts)) or ""
+        parts = BATCH_SEPARATOR_PATTERN.split(translated.strip())
+        if len(parts) != len(texts):
+            logger.warning(f"⚠️ Batch separator lost in translation, retrying {len(texts)} texts individually")
+            return None
+        return parts
+
+    def translate_batch(self, texts, source, target):
+        """Translate several texts with as few Google requests as possible, one after another.
+
+        The executor runs the packs in parallel instead (see TranslationExecutor.run_batch).
+        """
+        results = [None] * len(texts)
+        for indices in self.pack(texts):
+            group = [texts[i] for i in indices]
+            translated = self.translate_pack(group, source, target)
+            if translated is None:
+                translated = [self.translate(text, source, target) for text in group]
+            for i, text in zip(indices, translated):
+                results[i] = text
+        return results
+
+
+WORD_PATTERN = re.compile(r"\w+|\W+")
+
+
+class DictionaryBackend(TranslationBackend):
+    """Offline word-by-word translation from a glossary file.
+
+    The glossary maps target language -> {word: translation}. Unknown words
+    are kept as they are, so this is a rough but free and network-less
+    stand-in, useful for common short phrases and for testing.
+    """
+    name = "dictionary"
+    cost = 0.0
+
+    def __init__(self, glossary):
+        super().__init__()
+        self.glossary = {target: {word.lower(): t for word, t in words.items()} for target, words in glossary.items()}
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def supports(self, source, target):
+        return target in self.glossary
+
+    def translate(self, text, source, target):
+        words = self.glossary.get(target, {})
+        parts = []
+        for token in WORD_PATTERN.findall(text):
+            translated = words.get(token.lower())
+            if translated is None:
+                parts.append(token)
+            elif token[:1].isupper():
+                parts.append(translated[:1].upper() + translated[1:])
+            else:
+                parts.append(translated)
+        return "".join(parts)
+
+    def health_check(self):
+        return bool(self.glossary)
+
+
+class MockBackend(TranslationBackend):
+    """Local fake backend with configurable latency and failure rate (for load tests)."""
+    name = "mock"
+    cost = 0.0
+
+    def __init__(self, latency=0.05, jitter=0.0, failure_rate=0.0, name=None):
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        if name:
+            self.name = name
+        self.calls = 0
+
+    def translate(self, text, source, target):
+        self.calls += 1
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError(f"{self.name}: simulated failure")
+        return f"[{target}] {text}"
+
+    def translate_batch(self, texts, source, target):
+        # One simulated round trip for the whole batch
+        self.calls += 1
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter, self.jitter)))
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise RuntimeError(f"{self.name}: simulated failure")
+        return [f"[{target}] {text}" for text in texts]
+
+
+class BackendRegistry:
+    """Registered translation backends and per-language-pair selection."""
+
+    def __init__(self):
+        self._backends = {}
+
+    def __iter__(self):
+        return iter(list(self._backends.values()))
+
+    def __len__(self):
+        return len(self._backends)
+
+    def register(self, backend):
+        self._backends[backend.name] = backend
+        logger.info(f"🔌 Registered translation backend: {backend.name}")
+        return backend
+
+    def get(self, name):
+        return self._backends.get(name)
+
+    def candidates(self, source, target):
+        """Backends that support the pair, healthy ones first, cheapest first."""
+        supporting = [b for b in self._backends.values() if b.supports(source, target)]
+        if not supporting:
+            raise NoBackendAvailable(f"No translation backend supports {source} -> {target}")
+        # sorted() is stable, so equal-cost backends keep registration order
+        return sorted(supporting, key=lambda b: (not b.healthy, b.cost))
+
+    def select(self, source, target):
+        return self.candidates(source, target)[0]
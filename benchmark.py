@@ -0,0 +1,358 @@
+"""Offline load test for bot2.py.
+
+Drives on_message, on_raw_reaction_add, LanguageSelect.callback and the
+/stats and /listlanguages commands with synthetic events, using stand-in
+Discord objects and the local mock translation backend. Nothing talks to
+Discord or Google, and all data files are written to a temporary directory.
+
+    python benchmark.py --messages 2000 --latency 0.05
+    python benchmark.py --json --fail-p95 0.5    # exit 1 if any handler's p95 is above 0.5s
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+SAMPLE_SENTENCES = [
+    "Has anyone tried the new update yet?",
+    "The raid starts at nine tonight, please be on time.",
+    "I think we should move the meeting to tomorrow.",
+    "Check the pinned message for the rules of the event.",
+    "Does anyone know how to fix the login problem?",
+    "Thanks everyone for coming, that was a great session!",
+    "We need two more players for the tournament on Saturday.",
+    "Please remember to vote in the poll before Friday.",
+]
+LANGUAGES = ["pt", "es", "fr", "de", "it", "en", "pl", "tr"]
+
+_ids = itertools.count(1_000_000_000_000_000_000)
+
+
+# Stand-in Discord objects: only the attributes bot2.py reads
+
+class FakeAvatar:
+    url = "https://cdn.discordapp.com/embed/avatars/0.png"
+
+
+class FakePermissions:
+    def __init__(self, administrator):
+        self.administrator = administrator
+        self.manage_messages = administrator
+
+
+class FakeUser:
+    def __init__(self, guild, name, administrator=False, bot=False):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name
+        self.display_name = name
+        self.display_avatar = FakeAvatar()
+        self.mention = f"<@{self.id}>"
+        self.bot = bot
+        self.guild_permissions = FakePermissions(administrator)
+
+
+class FakeChannel:
+    def __init__(self, guild, name, rest_latency):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name
+        self.rest_latency = rest_latency
+        self.sent = 0
+
+    async def send(self, content=None, **kwargs):
+        await asyncio.sleep(self.rest_latency)
+        self.sent += 1
+        return FakeMessage(self, self.guild.me, content or "")
+
+
+class FakeGuild:
+    def __init__(self, guild_id, name, rest_latency):
+        self.id = guild_id
+        self.name = name
+        self.members = {}
+        self.me = FakeUser(self, "Translator", bot=True)
+        self.text_channels = [FakeChannel(self, "general", rest_latency), FakeChannel(self, "choose-language", rest_latency)]
+
+    def get_member(self, user_id):
+        return self.members.get(user_id)
+
+
+class FakeMessage:
+    def __init__(self, channel, author, content):
+        self.id = next(_ids)
+        self.channel = channel
+        self.guild = channel.guild
+        self.author = author
+        self.content = content
+        self.webhook_id = None
+        self.reference = None
+        self.attachments = []
+        self.embeds = []
+
+    async def add_reaction(self, emoji):
+        await asyncio.sleep(self.channel.rest_latency)
+
+
+class FakeReactionPayload:
+    def __init__(self, message, member):
+        self.emoji = "🌍"
+        self.member = member
+        self.user_id = member.id
+        self.guild_id = message.guild.id
+        self.channel_id = message.channel.id
+        self.message_id = message.id
+
+
+class FakeResponse:
+    def __init__(self, rest_latency):
+        self.rest_latency = rest_latency
+
+    async def send_message(self, *args, **kwargs):
+        await asyncio.sleep(self.rest_latency)
+
+    async def defer(self, *args, **kwargs):
+        await asyncio.sleep(self.rest_latency)
+
+
+class FakeInteraction:
+    def __init__(self, user, rest_latency):
+        self.user = user
+        self.guild = user.guild
+        self.response = FakeResponse(rest_latency)
+
+
+class FakeSelect:
+    def __init__(self, value):
+        self.values = [value]
+
+
+class FakeContext:
+    def __init__(self, author, rest_latency):
+        self.author = author
+        self.guild = author.guild
+        self.rest_latency = rest_latency
+
+    async def send(self, *args, **kwargs):
+        await asyncio.sleep(self.rest_latency)
+
+    async def defer(self, *args, **kwargs):
+        await asyncio.sleep(self.rest_latency)
+
+
+def percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def disk_io():
+    """(write syscalls, bytes written) for this process, or None where /proc isn't available."""
+    try:
+        with open("/proc/self/io") as f:
+            fields = dict(line.split(": ") for line in f.read().splitlines())
+        return int(fields["syscw"]), int(fields["write_bytes"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class Benchmark:
+    def __init__(self, bot2, args):
+        self.bot2 = bot2
+        self.args = args
+        self.latencies = {}
+        self.errors = {}
+        self.lag_samples = []
+        self.random = random.Random(args.seed)
+
+        guild_ids = list(bot2.ALLOWED_SERVERS)[:args.guilds]
+        self.guilds = [FakeGuild(guild_id, f"Guild {i}", args.rest_latency) for i, guild_id in enumerate(guild_ids)]
+        self.users = []
+        for guild in self.guilds:
+            for i in range(args.users):
+                user = FakeUser(guild, f"user{i}", administrator=(i == 0))
+                guild.members[user.id] = user
+                self.users.append(user)
+        self.channels = {channel.id: channel for guild in self.guilds for channel in guild.text_channels}
+
+    async def timed(self, name, coro):
+        started = time.perf_counter()
+        try:
+            await coro
+        except Exception as e:
+            self.errors[name] = self.errors.get(name, 0) + 1
+            if self.errors[name] == 1:
+                print(f"{name} failed: {e!r}", file=sys.stderr)
+        self.latencies.setdefault(name, []).append(time.perf_counter() - started)
+
+    async def flush_stats(self):
+        # Same write-behind cadence as flush_stats_task, which waits for a gateway connection
+        while True:
+            await asyncio.sleep(self.bot2.STATS_FLUSH_INTERVAL_SECONDS)
+            await self.bot2.flush_stats()
+
+    async def sample_lag(self):
+        while True:
+            self.lag_samples.append(await self.bot2.metrics.measure_loop_lag(0.01))
+
+    def message_text(self):
+        # A share of messages repeat earlier text, like greetings and announcements do
+        if self.random.random() < self.args.repeat_ratio:
+            return self.random.choice(SAMPLE_SENTENCES)
+        sentences = self.random.sample(SAMPLE_SENTENCES, self.random.randint(1, 3))
+        return " ".join(sentences) + f" #{self.random.randint(0, 1_000_000)}"
+
+    async def choose_languages(self):
+        select = self.bot2.LanguageSelect.callback
+        await asyncio.gather(*(
+            self.timed("language_select", select(FakeSelect(self.random.choice(LANGUAGES)), FakeInteraction(user, self.args.rest_latency)))
+            for user in self.users
+        ))
+
+    async def message_and_reactions(self, semaphore):
+        async with semaphore:
+            guild = self.random.choice(self.guilds)
+            channel = guild.text_channels[0]
+            author = self.random.choice(list(guild.members.values()))
+            message = FakeMessage(channel, author, self.message_text())
+            await self.timed("on_message", self.bot2.on_message(message))
+
+            readers = [m for m in guild.members.values() if m is not author]
+            for member in self.random.sample(readers, min(len(readers), self.args.reactions)):
+                await self.timed("on_raw_reaction_add", self.bot2.on_raw_reaction_add(FakeReactionPayload(message, member)))
+
+    async def commands(self):
+        for guild in self.guilds:
+            admin = next(iter(guild.members.values()))
+            await self.timed("stats", self.bot2.stats.callback(FakeContext(admin, self.args.rest_latency)))
+            await self.timed("listlanguages", self.bot2.list_languages.callback(FakeContext(admin, self.args.rest_latency)))
+
+    async def run(self):
+        bot2 = self.bot2
+        # No gateway: commands are driven directly, and channels are looked up in the fake guilds
+        async def no_commands(message):
+            return None
+        bot2.bot.process_commands = no_commands
+        bot2.bot.get_channel = self.channels.get
+
+        bot2.reaction_scheduler.start()
+        flush_task = asyncio.ensure_future(self.flush_stats())
+        lag_task = asyncio.ensure_future(self.sample_lag())
+
+        io_before = disk_io()
+        started = time.perf_counter()
+
+        await self.choose_languages()
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        workload = [self.message_and_reactions(semaphore) for _ in range(self.args.messages)]
+        # Commands run every so often while messages are flowing
+        for i in range(0, len(workload), max(1, self.args.commands_every)):
+            await asyncio.gather(*workload[i:i + self.args.commands_every], self.commands())
+        await bot2.flush_stats()
+
+        elapsed = time.perf_counter() - started
+        io_after = disk_io()
+
+        lag_task.cancel()
+        flush_task.cancel()
+        bot2.reaction_scheduler.stop()
+
+        sent = sum(channel.sent for channel in self.channels.values())
+        report = {
+            "elapsed_seconds": round(elapsed, 3),
+            "handlers": {
+                name: {
+                    "count": len(samples),
+                    "errors": self.errors.get(name, 0),
+                    "p50": round(percentile(samples, 0.50), 4),
+                    "p95": round(percentile(samples, 0.95), 4),
+                    "p99": round(percentile(samples, 0.99), 4),
+                }
+                for name, samples in sorted(self.latencies.items())
+            },
+            "loop_lag": {
+                "p50": round(percentile(self.lag_samples, 0.50), 4),
+                "p99": round(percentile(self.lag_samples, 0.99), 4),
+                "max": round(max(self.lag_samples, default=0.0), 4),
+            },
+            "translations_per_second": round(sent / elapsed, 2),
+            "backend_calls": sum(getattr(backend, "calls", 0) for backend in bot2.translator.backends),
+            "cache_hit_rate": round(bot2.translation_cache.hit_rate, 3),
+        }
+        if io_before and io_after:
+            report["disk_writes_per_second"] = round((io_after[0] - io_before[0]) / elapsed, 2)
+            report["disk_bytes_per_second"] = round((io_after[1] - io_before[1]) / elapsed, 1)
+        return report
+
+
+def print_report(report):
+    print(f"⏱️ {report['elapsed_seconds']}s elapsed")
+    print(f"{'handler':<22}{'count':>8}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, h in report["handlers"].items():
+        print(f"{name:<22}{h['count']:>8}{h['errors']:>8}{h['p50']:>10.4f}{h['p95']:>10.4f}{h['p99']:>10.4f}")
+    lag = report["loop_lag"]
+    print(f"🐢 Loop lag: p50 {lag['p50']:.4f}s, p99 {lag['p99']:.4f}s, max {lag['max']:.4f}s")
+    print(f"🔄 {report['translations_per_second']} translations/s, {report['backend_calls']} backend calls, "
+          f"cache hit rate {report['cache_hit_rate']:.1%}")
+    if "disk_writes_per_second" in report:
+        print(f"💾 {report['disk_writes_per_second']} disk writes/s ({report['disk_bytes_per_second']:.0f} bytes/s)")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the translator bot")
+    parser.add_argument("--guilds", type=int, default=3, help="Guilds to simulate (at most the whitelist size)")
+    parser.add_argument("--users", type=int, default=50, help="Members per guild")
+    parser.add_argument("--messages", type=int, default=1000, help="Messages to send")
+    parser.add_argument("--reactions", type=int, default=3, help="🌍 reactions per message")
+    parser.add_argument("--concurrency", type=int, default=50, help="Messages handled at the same time")
+    parser.add_argument("--commands-every", type=int, default=200, help="Run /stats and /listlanguages every N messages")
+    parser.add_argument("--repeat-ratio", type=float, default=0.3, help="Share of messages that repeat earlier text")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock translation backend latency in seconds")
+    parser.add_argument("--rest-latency", type=float, default=0.02, help="Simulated Discord REST latency in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--verbose", action="store_true", help="Keep the bot's info logging")
+    parser.add_argument("--fail-p95", type=float, help="Exit with status 1 if any handler's p95 exceeds this many seconds")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # bot2.py reads its configuration at import time and writes data files to the working directory
+    os.environ["TRANSLATION_BACKENDS"] = "mock"
+    os.environ["MOCK_TRANSLATION_LATENCY"] = str(args.latency)
+    os.environ.pop("SHARD_COUNT", None)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    with tempfile.TemporaryDirectory(prefix="translator-bench-") as data_dir:
+        os.chdir(data_dir)
+        import bot2
+        if not args.verbose:
+            logging.getLogger('discord_translator').setLevel(logging.WARNING)
+        try:
+            report = asyncio.run(Benchmark(bot2, args).run())
+        finally:
+            bot2.translator.shutdown()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+    if args.fail_p95 is not None:
+        slow = [name for name, h in report["handlers"].items() if h["p95"] > args.fail_p95]
+        if slow:
+            print(f"❌ p95 above {args.fail_p95}s: {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
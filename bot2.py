@@ -1,13 +1,30 @@
 import discord
 from discord.ext import commands, tasks
-from deep_translator import GoogleTranslator
 from collections import defaultdict, Counter
 import os
-import json
+import glob
+import itertools
 import asyncio
 import logging
+import time
 from logging.handlers import RotatingFileHandler
 from datetime import datetime
+from typing import Literal
+from backends import BackendRegistry, GoogleBackend, DictionaryBackend, MockBackend, NoBackendAvailable
+from routing import BackendRouter
+from translation import TranslationExecutor, TranslationQueueFull, TranslationCache, SingleFlight, TranslationBatcher, RecentTranslations, make_cache_key, text_digest
+from langid import LanguageDetector
+from timeseries import TranslationTimeline
+from aggregates import GlobalStats
+from segmentation import plan_segments
+from message_parts import MessageParts, MessageCache, content_digest, clip_text, fit_embed, embed_length, EMBED_LIMITS, MAX_OUTPUT_EMBEDS, EMBED_TOTAL_LIMIT
+from storage import TranslationStore, PreferenceStore, ChannelSettingsStore, DeletionStore, MenuStore
+from scheduling import ReactionScheduler, DeletionScheduler
+from persistence import atomic_write_json, read_json, PersistenceError
+import metrics
+
+# Each cluster process gets its own log file: rotation isn't safe across processes
+LOG_FILE = os.path.join("logs", f"bot.cluster{os.environ['CLUSTER_ID']}.log" if "CLUSTER_ID" in os.environ else "bot.log")
 
 # Configure logging system
 def setup_logging():
@@ -37,7 +54,7 @@ def setup_logging():
     
     # File handler with rotation (max 10MB, keep 5 backup files)
     file_handler = RotatingFileHandler(
-        os.path.join(logs_dir, 'bot.log'),
+        LOG_FILE,
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5,
         encoding='utf-8'
@@ -53,13 +70,15 @@ def setup_logging():
     # Add handlers to logger
     logger.addHandler(file_handler)
     logger.addHandler(console_handler)
+    # Our handlers are complete; don't repeat every line through a root handler
+    logger.propagate = False
     
     return logger
 
 # Initialize logging
 logger = setup_logging()
 logger.info("🚀 Discord Translator Bot - Logging system initialized")
-logger.info(f"📁 Log files will be stored in: logs/bot.log")
+logger.info(f"📁 Log files will be stored in: {LOG_FILE}")
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -68,11 +87,31 @@ intents.guilds = True
 intents.members = True
 intents.reactions = True
 
-bot = commands.Bot(
+# Sharding is configured by launcher.py through the environment.
+# SHARD_COUNT > 1 runs an AutoShardedBot; SHARD_IDS limits this process to some of the shards.
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "1"))
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("SHARD_IDS", "").split(",") if shard_id.strip()] or None
+CLUSTER_ID = int(os.getenv("CLUSTER_ID", "0"))
+SHARDED = SHARD_COUNT > 1
+
+bot_options = dict(
     command_prefix="!",
     intents=intents,
+    max_messages=None,  # Translations use their own compact message_cache instead
     allowed_mentions=discord.AllowedMentions.none()
 )
+if SHARDED:
+    bot = commands.AutoShardedBot(shard_count=SHARD_COUNT, shard_ids=SHARD_IDS, **bot_options)
+    logger.info(f"🧩 Sharded mode: cluster {CLUSTER_ID}, shards {SHARD_IDS or 'all'} of {SHARD_COUNT}")
+else:
+    bot = commands.Bot(**bot_options)
+
+def shard_for_guild(guild_id):
+    """Shard that receives events for a guild (Discord's sharding formula)."""
+    return (int(guild_id) >> 22) % SHARD_COUNT
+
+def local_shards():
+    return SHARD_IDS if SHARD_IDS is not None else list(range(SHARD_COUNT))
 
 LANGUAGES = {
     '🇬🇧': 'en',
@@ -125,6 +164,11 @@ LANGUAGE_NAMES = {
 
 LANGUAGE_FILE = "languages.json"
 STATS_FILE = "translation_stats.json"
+TRANSLATION_DB_FILE = "translations.db"
+BOT_DB_FILE = "bot.db"
+
+# Gzip the JSON data files (reading detects either format automatically)
+COMPRESS_DATA_FILES = False
 
 # Reading time calculation constants
 READING_SPEED_CHARS_PER_MINUTE = 1000   # Average reading speed in characters per minute
@@ -132,6 +176,67 @@ READING_TIME_SAFETY_FACTOR = 1.2        # Safety factor to give users more time
 MIN_READING_TIME_SECONDS = 5            # Minimum display time in seconds
 MAX_READING_TIME_SECONDS = 60           # Maximum display time in seconds
 
+# How often changed stats are written to disk
+STATS_FLUSH_INTERVAL_SECONDS = 30
+
+# Answer the Translate context menu directly if the translation is ready within this time,
+# otherwise defer and send a follow-up (Discord requires a response within 3 seconds)
+CONTEXT_MENU_DEFER_AFTER_SECONDS = 2.0
+
+# Guilds whose #choose-language menu is checked at the same time during startup
+GUILD_SETUP_CONCURRENCY = 5
+
+# How often the event loop lag is sampled for /metrics
+LOOP_LAG_SAMPLE_INTERVAL_SECONDS = 1
+LOOP_STALL_THRESHOLD_SECONDS = 0.5     # Log a stack trace when the event loop is blocked this long
+
+# Translation backends, cheapest first among those supporting a language pair.
+# "google" (default), "dictionary" (offline, uses GLOSSARY_FILE) and "mock" (local fake for load tests).
+TRANSLATION_BACKENDS = [name.strip() for name in os.getenv("TRANSLATION_BACKENDS", "google").split(",") if name.strip()]
+GLOSSARY_FILE = "glossary.json"
+MOCK_TRANSLATION_LATENCY_SECONDS = float(os.getenv("MOCK_TRANSLATION_LATENCY", "0.05"))
+BACKEND_HEALTH_CHECK_MINUTES = 5
+
+# Backend routing: hedge to the next backend once the current one is slower than
+# its p95 latency (clamped to these bounds), and open a circuit after repeated failures
+BACKEND_HEDGE_PERCENTILE = 0.95
+BACKEND_MIN_HEDGE_DELAY_SECONDS = 0.25
+BACKEND_MAX_HEDGE_DELAY_SECONDS = 3.0
+BACKEND_FAILURE_THRESHOLD = 3
+BACKEND_BASE_BACKOFF_SECONDS = 5
+BACKEND_MAX_BACKOFF_SECONDS = 300
+
+# Translation executor settings
+TRANSLATION_WORKERS = 8                 # Translations running in parallel
+TRANSLATION_MAX_QUEUE = 100             # Translations allowed to wait for a worker
+TRANSLATION_TIMEOUT_SECONDS = 10        # Per-request timeout
+TRANSLATION_BATCH_WINDOW_SECONDS = 0.1  # How long to collect jobs before dispatching a batch
+TRANSLATION_MAX_BATCH = 25              # Dispatch early once this many jobs are waiting
+DEDUP_WINDOW_SECONDS = 120              # Ignore repeated reactions by the same user within this window
+DEDUP_MAX_ENTRIES = 100000              # Upper bound on remembered (message, user) pairs
+MESSAGE_CACHE_SIZE = 5000               # Recent messages kept (text only) for reactions without a fetch
+TRANSLATION_SEGMENT_MAX_CHARS = 1500    # Longer messages are split at sentence boundaries and translated in parallel
+
+# Translation cache settings
+TRANSLATION_CACHE_SIZE = 5000           # Max cached translations kept in memory
+TRANSLATION_CACHE_TTL_SECONDS = 24 * 3600
+TRANSLATION_STORE_MAX_ROWS = 50000      # Max translations kept on disk
+TRANSLATION_STORE_WARM_ROWS = 2000      # Translations preloaded into memory at startup
+
+# Local language detection: skip translating text that is already in the target language
+LANGUAGE_DETECTION_MIN_CONFIDENCE = 0.4  # Below this we translate anyway
+LANGUAGE_DETECTION_CACHE_SIZE = 10000   # Detected languages remembered per message text
+
+# Reaction seeding settings (one 🌍 per message, paced per channel)
+AUTO_REACT_DEFAULT = True               # Seed reactions in channels without an explicit /autoreact setting
+REACTION_SEED_RATE = 1.0                # Reactions per second per channel
+REACTION_SEED_BURST = 2                 # Reactions a quiet channel can send back to back
+REACTION_SEED_MAX_AGE_SECONDS = 30      # Don't seed messages that waited longer than this
+REACTION_SEED_MAX_BACKLOG = 500         # Drop new messages once this many are waiting
+REACTION_SEED_LOW_PRIORITY_BACKLOG = 100  # Drop short messages once this many are waiting
+REACTION_SEED_MIN_PRIORITY_CHARS = 20   # Messages at least this long are seeded first
+REACTION_SEED_PAUSE_QUEUE_DEPTH = 4     # Pause seeding while this many translations are pending
+
 # Allowed server IDs - Add your server IDs here
 # To get a server ID, use the /serverid command
 ALLOWED_SERVERS = [
@@ -155,9 +260,8 @@ def get_language_name(lang_code):
 
 def get_user_language_status(user_id):
     """Get formatted language status message for a user."""
-    user_id_str = str(user_id)
-    if user_id_str in user_languages:
-        current_lang = user_languages[user_id_str]
+    current_lang = preferences.get(user_id)
+    if current_lang:
         current_lang_name = get_language_name(current_lang)
         return f"Your current language: **{current_lang_name}**"
     return "No language configured yet"
@@ -178,14 +282,13 @@ def calculate_reading_time(text):
 
 def load_languages():
     try:
-        with open(LANGUAGE_FILE, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            logger.info(f"✅ Loaded {len(data)} user language configurations")
-            return data
+        data = read_json(LANGUAGE_FILE, "languages")
+        logger.info(f"✅ Loaded {len(data)} user language configurations")
+        return data
     except FileNotFoundError:
         logger.warning(f"⚠️ File {LANGUAGE_FILE} not found, starting with empty configuration")
         return {}
-    except json.JSONDecodeError as e:
+    except PersistenceError as e:
         logger.error(f"❌ Error parsing {LANGUAGE_FILE}: {e}")
         logger.info("🔄 Creating backup and starting fresh")
         # Create backup of corrupted file
@@ -198,143 +301,385 @@ def load_languages():
         logger.error(f"❌ Unexpected error loading languages: {e}")
         return {}
 
-def save_languages():
+def save_languages(languages):
+    """Export user languages to the JSON file (a portable backup of the database)."""
     try:
-        # Make backup before overwriting
-        if os.path.exists(LANGUAGE_FILE):
-            try:
-                os.rename(LANGUAGE_FILE, f"{LANGUAGE_FILE}.temp")
-            except:
-                pass
-        
-        with open(LANGUAGE_FILE, "w", encoding='utf-8') as f:
-            json.dump(user_languages, f, indent=2, ensure_ascii=False)
-        
-        # Verify that it was saved correctly
-        with open(LANGUAGE_FILE, "r", encoding='utf-8') as f:
-            saved_data = json.load(f)
-            if len(saved_data) != len(user_languages):
-                raise ValueError("Data verification failed after save")
-        
-        # Remove temporary backup if everything went well
-        temp_file = f"{LANGUAGE_FILE}.temp"
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
-            
-        logger.info(f"✅ Saved {len(user_languages)} user configurations")
-        
+        with metrics.SAVE_DURATION.time(file="languages"):
+            atomic_write_json(LANGUAGE_FILE, languages, "languages", compress=COMPRESS_DATA_FILES)
+        logger.info(f"✅ Saved {len(languages)} user configurations")
     except Exception as e:
         logger.error(f"❌ Error saving languages: {e}")
-        # Try to restore backup if it exists
-        temp_file = f"{LANGUAGE_FILE}.temp"
-        if os.path.exists(temp_file):
-            try:
-                os.rename(temp_file, LANGUAGE_FILE)
-                logger.info("🔄 Restored from backup")
-            except:
-                logger.error("❌ Failed to restore backup")
         raise e
 
-def load_stats():
-    """Load translation statistics from file."""
+def new_guild_stats():
+    return {
+        "total": 0,
+        "per_user": defaultdict(int),
+        "per_language": Counter(),
+        "timeline": TranslationTimeline()
+    }
+
+def empty_stats():
+    return defaultdict(new_guild_stats)
+
+def stats_file_for_shard(shard_id):
+    """Stats are partitioned into one file per shard when sharded, named for the shard count."""
+    if not SHARDED:
+        return STATS_FILE
+    base, ext = os.path.splitext(STATS_FILE)
+    return f"{base}.shard{shard_id}of{SHARD_COUNT}{ext}"
+
+def current_stats_files():
+    return [stats_file_for_shard(shard_id) for shard_id in range(SHARD_COUNT)]
+
+def existing_stats_files():
+    """Every stats file on disk, whichever shard count it was written for, oldest first."""
+    base, ext = os.path.splitext(STATS_FILE)
+    found = []
+    for path in glob.glob(f"{glob.escape(base)}.shard*{ext}") + [STATS_FILE]:
+        try:
+            found.append((os.path.getmtime(path), path))
+        except FileNotFoundError:
+            continue
+    return [path for _, path in sorted(found)]
+
+def stale_stats_files():
+    current = set(current_stats_files())
+    return [path for path in existing_stats_files() if path not in current]
+
+def retire_stale_stats_files():
+    """Delete stats files left by another shard count once every current file is newer.
+
+    Each process reads all stats files before it writes its own, so by then
+    every cluster has taken over its guilds from them. Returns True when none
+    are left.
+    """
     try:
-        with open(STATS_FILE, "r", encoding='utf-8') as f:
-            data = json.load(f)
-            
-            # Convert to per-guild structure
-            stats_by_guild = defaultdict(lambda: {
-                "total": 0,
-                "per_user": defaultdict(int),
-                "per_language": Counter()
-            })
-            
-            # Load each guild's stats
-            for guild_id_str, guild_data in data.items():
-                guild_id = int(guild_id_str)
-                stats_by_guild[guild_id] = {
-                    "total": guild_data.get("total", 0),
-                    "per_user": defaultdict(int, {int(k): v for k, v in guild_data.get("per_user", {}).items()}),
-                    "per_language": Counter(guild_data.get("per_language", {}))
-                }
-            
-            total_translations = sum(g["total"] for g in stats_by_guild.values())
-            logger.info(f"✅ Loaded translation stats for {len(stats_by_guild)} servers: {total_translations} total translations")
-            return stats_by_guild
+        oldest_current = min(os.path.getmtime(path) for path in current_stats_files())
+    except FileNotFoundError:
+        return False  # Some shard hasn't written its file in this layout yet
+    remaining = False
+    for path in stale_stats_files():
+        try:
+            if os.path.getmtime(path) < oldest_current:
+                os.remove(path)
+                logger.info(f"🧹 Retired old stats file {path}")
+            else:
+                remaining = True
+        except FileNotFoundError:
+            pass  # Another cluster retired it first
+    return not remaining
+
+def read_stats_file(path):
+    """Read one stats file as the raw {guild_id: stats} dict (empty if missing or corrupted)."""
+    try:
+        return read_json(path, "translation_stats")
     except FileNotFoundError:
-        logger.warning(f"⚠️ File {STATS_FILE} not found, starting with empty stats")
-        return defaultdict(lambda: {
-            "total": 0,
-            "per_user": defaultdict(int),
-            "per_language": Counter()
-        })
-    except json.JSONDecodeError as e:
-        logger.error(f"❌ Error parsing {STATS_FILE}: {e}")
+        logger.warning(f"⚠️ File {path} not found, starting with empty stats")
+        return {}
+    except PersistenceError as e:
+        logger.error(f"❌ Error parsing {path}: {e}")
         logger.info("🔄 Creating backup and starting fresh")
         try:
-            os.rename(STATS_FILE, f"{STATS_FILE}.backup")
+            os.rename(path, f"{path}.backup")
         except:
             pass
-        return defaultdict(lambda: {
-            "total": 0,
-            "per_user": defaultdict(int),
-            "per_language": Counter()
-        })
+        return {}
     except Exception as e:
         logger.error(f"❌ Unexpected error loading stats: {e}")
-        return defaultdict(lambda: {
-            "total": 0,
-            "per_user": defaultdict(int),
-            "per_language": Counter()
-        })
+        return {}
 
-def save_stats():
+def load_stats():
+    """Load translation statistics for the shards handled by this process.
+
+    Every stats file is read, whichever shard count it was written for, so
+    changing SHARD_COUNT (or going back to one process) keeps all counts.
+    Files are applied oldest first so a guild's newest copy wins, and only
+    guilds that now belong to a local shard are kept.
+    """
+    data = {}
+    for path in existing_stats_files():
+        data.update(read_stats_file(path))
+    shards = set(local_shards())
+    data = {g: d for g, d in data.items() if shard_for_guild(g) in shards}
+    
+    # Convert to per-guild structure
+    stats_by_guild = empty_stats()
+    
+    # Load each guild's stats
+    for guild_id_str, guild_data in data.items():
+        guild_id = int(guild_id_str)
+        stats_by_guild[guild_id] = {
+            "total": guild_data.get("total", 0),
+            "per_user": defaultdict(int, {int(k): v for k, v in guild_data.get("per_user", {}).items()}),
+            "per_language": Counter(guild_data.get("per_language", {})),
+            "timeline": TranslationTimeline.from_dict(guild_data.get("timeline"))
+        }
+    
+    total_translations = sum(g["total"] for g in stats_by_guild.values())
+    logger.info(f"✅ Loaded translation stats for {len(stats_by_guild)} servers: {total_translations} total translations")
+    return stats_by_guild
+
+def snapshot_stats(shard_id=None):
+    """Convert translation statistics to a JSON-serializable dict (by guild), optionally for one shard."""
+    data = {}
+    for guild_id, guild_stats in translation_stats.items():
+        if shard_id is not None and shard_for_guild(guild_id) != shard_id:
+            continue
+        guild_stats["timeline"].prune()
+        data[str(guild_id)] = {
+            "total": guild_stats["total"],
+            "per_user": {str(k): v for k, v in guild_stats["per_user"].items()},
+            "per_language": dict(guild_stats["per_language"]),
+            "timeline": guild_stats["timeline"].to_dict()
+        }
+    return data
+
+def save_stats(data=None, path=STATS_FILE):
     """Save translation statistics to file."""
+    if data is None:
+        data = snapshot_stats()
     try:
-        # Make backup before overwriting
-        if os.path.exists(STATS_FILE):
-            try:
-                os.rename(STATS_FILE, f"{STATS_FILE}.temp")
-            except:
-                pass
-        
-        # Convert to JSON-serializable format (by guild)
-        data_to_save = {}
-        for guild_id, guild_stats in translation_stats.items():
-            data_to_save[str(guild_id)] = {
-                "total": guild_stats["total"],
-                "per_user": {str(k): v for k, v in guild_stats["per_user"].items()},
-                "per_language": dict(guild_stats["per_language"])
-            }
-        
-        with open(STATS_FILE, "w", encoding='utf-8') as f:
-            json.dump(data_to_save, f, indent=2, ensure_ascii=False)
-        
-        # Remove temporary backup if everything went well
-        temp_file = f"{STATS_FILE}.temp"
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
-        
-        total_translations = sum(g["total"] for g in translation_stats.values())
-        logger.info(f"✅ Saved translation stats for {len(translation_stats)} servers: {total_translations} total translations")
-        
+        with metrics.SAVE_DURATION.time(file="stats"):
+            atomic_write_json(path, data, "translation_stats", compress=COMPRESS_DATA_FILES)
+        total_translations = sum(g["total"] for g in data.values())
+        logger.info(f"✅ Saved translation stats for {len(data)} servers: {total_translations} total translations")
     except Exception as e:
         logger.error(f"❌ Error saving stats: {e}")
-        # Try to restore backup if it exists
-        temp_file = f"{STATS_FILE}.temp"
-        if os.path.exists(temp_file):
-            try:
-                os.rename(temp_file, STATS_FILE)
-                logger.info("🔄 Restored stats from backup")
-            except:
-                logger.error("❌ Failed to restore stats backup")
+        raise e
 
-user_languages = load_languages()
+# User language preferences live in SQLite; languages.json is imported once
+preferences = PreferenceStore(BOT_DB_FILE)
+if len(preferences) == 0 and os.path.exists(LANGUAGE_FILE):
+    migrated = preferences.migrate(load_languages())
+    logger.info(f"📦 Migrated {migrated} user language configurations from {LANGUAGE_FILE}")
 
 # Load translation stats from file or start fresh
 translation_stats = load_stats()
 
-# Store pairs (message.id, user.id) to avoid duplicate translations
-translated_messages = set()
+# Cross-guild totals for the admin /stats view, kept up to date by record_translation
+global_stats = GlobalStats.from_stats(translation_stats)
+
+# Stats are updated in memory and written behind by flush_stats_task;
+# only the shards whose stats changed are rewritten. Files left by another
+# shard count are rewritten in this layout once, then retired.
+stats_files_to_retire = bool(stale_stats_files())
+dirty_stats_shards = set(local_shards()) if stats_files_to_retire else set()
+stats_flush_lock = asyncio.Lock()
+
+def record_translation(guild_id, user_id, lang):
+    """Count a translation in memory; the disk write happens on the next flush."""
+    if guild_id not in translation_stats:
+        translation_stats[guild_id] = new_guild_stats()
+    
+    guild_stats = translation_stats[guild_id]
+    global_stats.record(user_id, lang, first_in_guild=user_id not in guild_stats["per_user"])
+    guild_stats["total"] += 1
+    guild_stats["per_user"][user_id] += 1
+    guild_stats["per_language"][lang] += 1
+    guild_stats["timeline"].record(lang)
+    dirty_stats_shards.add(shard_for_guild(guild_id))
+
+async def flush_stats():
+    """Write changed stats to disk on a worker thread."""
+    global stats_files_to_retire
+    async with stats_flush_lock:
+        for shard_id in list(dirty_stats_shards):
+            # Snapshot on the loop so the worker thread never sees stats mid-update
+            data = snapshot_stats(shard_id if SHARDED else None)
+            dirty_stats_shards.discard(shard_id)
+            try:
+                await asyncio.to_thread(save_stats, data, stats_file_for_shard(shard_id))
+            except Exception:
+                dirty_stats_shards.add(shard_id)
+                raise
+        if stats_files_to_retire:
+            stats_files_to_retire = not await asyncio.to_thread(retire_stale_stats_files)
+
+# Recently translated (message.id, user.id) pairs, used to skip duplicate translations
+translated_messages = RecentTranslations(
+    window_seconds=DEDUP_WINDOW_SECONDS,
+    max_entries=DEDUP_MAX_ENTRIES
+)
+
+# Text of recent messages, so reactions on them don't need discord.py's message cache or a fetch
+message_cache = MessageCache(max_entries=MESSAGE_CACHE_SIZE)
+metrics.MESSAGE_CACHE_ENTRIES.set_function(lambda: len(message_cache))
+metrics.MESSAGE_CACHE_MISSES.set_function(lambda: message_cache.misses)
+
+def build_backends():
+    """Register the translation backends listed in TRANSLATION_BACKENDS."""
+    backends = BackendRegistry()
+    for name in TRANSLATION_BACKENDS:
+        try:
+            if name == "google":
+                backends.register(GoogleBackend())
+            elif name == "dictionary":
+                backends.register(DictionaryBackend.from_file(GLOSSARY_FILE))
+            elif name == "mock":
+                backends.register(MockBackend(latency=MOCK_TRANSLATION_LATENCY_SECONDS))
+            else:
+                logger.warning(f"⚠️ Unknown translation backend '{name}', skipping")
+        except Exception as e:
+            logger.error(f"❌ Error loading translation backend '{name}': {e}")
+    if len(backends) == 0:
+        logger.warning("⚠️ No translation backends loaded, falling back to Google")
+        backends.register(GoogleBackend())
+    return backends
+
+# Translations run on a worker pool so the gateway loop never blocks on HTTP
+translator = TranslationExecutor(
+    max_workers=TRANSLATION_WORKERS,
+    max_queue=TRANSLATION_MAX_QUEUE,
+    timeout=TRANSLATION_TIMEOUT_SECONDS,
+    backends=build_backends()
+)
+
+# Failover, circuit breakers and hedged requests across the registered backends
+translation_router = BackendRouter(
+    translator,
+    hedge_percentile=BACKEND_HEDGE_PERCENTILE,
+    min_hedge_delay=BACKEND_MIN_HEDGE_DELAY_SECONDS,
+    max_hedge_delay=BACKEND_MAX_HEDGE_DELAY_SECONDS,
+    failure_threshold=BACKEND_FAILURE_THRESHOLD,
+    base_backoff=BACKEND_BASE_BACKOFF_SECONDS,
+    max_backoff=BACKEND_MAX_BACKOFF_SECONDS,
+    on_result=lambda backend, result: metrics.BACKEND_REQUESTS.inc(backend=backend, result=result)
+)
+
+# Reaction bursts are grouped per target language into batched backend calls
+translation_batcher = TranslationBatcher(
+    translation_router,
+    window=TRANSLATION_BATCH_WINDOW_SECONDS,
+    max_batch=TRANSLATION_MAX_BATCH
+)
+
+# Repeated reactions on the same message reuse the earlier translation
+translation_cache = TranslationCache(
+    max_entries=TRANSLATION_CACHE_SIZE,
+    ttl_seconds=TRANSLATION_CACHE_TTL_SECONDS
+)
+
+# Translations are also kept on disk so restarts don't start with a cold cache
+translation_store = TranslationStore(TRANSLATION_DB_FILE, max_rows=TRANSLATION_STORE_MAX_ROWS)
+
+def warm_translation_cache():
+    """Preload the most recently used stored translations into memory."""
+    try:
+        rows = translation_store.most_recent(TRANSLATION_STORE_WARM_ROWS)
+        # Insert oldest first so the most recent entries end up most recently used
+        for key, translated in reversed(rows):
+            translation_cache.put(key, translated)
+        logger.info(f"✅ Warmed translation cache with {len(rows)} stored translations")
+    except Exception as e:
+        logger.error(f"❌ Error warming translation cache: {e}")
+
+warm_translation_cache()
+
+# Expose translation internals on the keep_alive /metrics endpoint
+metrics.CACHE_HITS.set_function(lambda: translation_cache.hits)
+metrics.CACHE_MISSES.set_function(lambda: translation_cache.misses)
+metrics.CACHE_EVICTIONS.set_function(lambda: translation_cache.evictions)
+metrics.CACHE_HIT_RATE.set_function(lambda: translation_cache.hit_rate)
+metrics.QUEUE_DEPTH.set_function(lambda: translator.queue_depth)
+metrics.GATEWAY_LATENCY.set_function(lambda: bot.latency)
+
+# Identical translations requested at the same time share one backend call
+translation_flights = SingleFlight()
+
+# Batch group for messages whose language couldn't be detected: one per message
+message_batch_groups = itertools.count()
+
+# Local language identification, cached per message text
+language_detector = LanguageDetector(
+    min_confidence=LANGUAGE_DETECTION_MIN_CONFIDENCE,
+    max_entries=LANGUAGE_DETECTION_CACHE_SIZE
+)
+
+async def translate_text(text, lang, source='auto', batch_group=None):
+    """Translate text, serving repeated requests from the memory or disk cache.
+
+    Only uncached texts with the same batch_group share a backend batch.
+    """
+    # Already in the reader's language: return it as is without calling a backend
+    if source == 'auto' and language_detector.is_same_language(text, lang, cache_key=text_digest(text)):
+        metrics.SAME_LANGUAGE_SKIPS.inc()
+        return text
+
+    key = make_cache_key(text, lang, source)
+    cached = translation_cache.get(key)
+    if cached is not None:
+        return cached
+
+    return await translation_flights.do(key, lambda: _translate_uncached(key, text, lang, source, batch_group))
+
+async def _translate_uncached(key, text, lang, source, batch_group):
+    """Look up the disk cache, then the backend, storing the result in both caches."""
+    try:
+        stored = await asyncio.to_thread(translation_store.get, key)
+    except Exception as e:
+        logger.error(f"❌ Error reading translation store: {e}")
+        stored = None
+    if stored is not None:
+        translation_cache.put(key, stored)
+        return stored
+
+    with metrics.TRANSLATION_LATENCY.time():
+        translated = await translation_batcher.translate(text, lang, source, group=batch_group)
+    if translated:
+        translation_cache.put(key, translated)
+        try:
+            await asyncio.to_thread(translation_store.put, key, translated)
+        except Exception as e:
+            logger.error(f"❌ Error writing translation store: {e}")
+    return translated
+
+async def translate_message_texts(texts, lang):
+    """Translate pieces of Discord message text, leaving code, mentions, emoji and links untouched.
+
+    Every segment of every piece goes through translate_text at once, so
+    segments are cached on their own and all of them share one backend batch.
+    The backend detects one source language per batch, so segments are only
+    batched with other messages detected as the same language; when
+    detection isn't confident, only with segments of this message.
+    """
+    plans = [plan_segments(text, max_chars=TRANSLATION_SEGMENT_MAX_CHARS) for text in texts]
+    segments = [segment for plan in plans for segment in plan.translatable()]
+    joined = "\n".join(texts)
+    batch_group = language_detector.detect(joined, cache_key=text_digest(joined)) or next(message_batch_groups)
+    translated = iter(await asyncio.gather(*(translate_text(segment, lang, batch_group=batch_group) for segment in segments)))
+    return [plan.assemble([next(translated) for _ in plan.translatable()]) for plan in plans]
+
+# Channels where /autoreact overrides AUTO_REACT_DEFAULT
+channel_settings = ChannelSettingsStore(BOT_DB_FILE)
+auto_react_overrides = channel_settings.auto_react_overrides()
+
+def is_auto_react_enabled(channel_id):
+    return auto_react_overrides.get(channel_id, AUTO_REACT_DEFAULT)
+
+# Seeds 🌍 reactions within per-channel rate limits, yielding to pending translations
+reaction_scheduler = ReactionScheduler(
+    "🌍",
+    rate=REACTION_SEED_RATE,
+    burst=REACTION_SEED_BURST,
+    max_age=REACTION_SEED_MAX_AGE_SECONDS,
+    max_backlog=REACTION_SEED_MAX_BACKLOG,
+    low_priority_backlog=REACTION_SEED_LOW_PRIORITY_BACKLOG,
+    is_busy=lambda: translator.queue_depth >= REACTION_SEED_PAUSE_QUEUE_DEPTH,
+    on_result=lambda result: metrics.REACTIONS_SEEDED.inc(result=result)
+)
+metrics.REACTION_BACKLOG.set_function(lambda: len(reaction_scheduler))
+
+# Known language menu per guild; guilds verified since startup are skipped on reconnect
+menu_store = MenuStore(BOT_DB_FILE)
+language_menus = menu_store.all()
+verified_guilds = set()
+guild_sweep_task = None
+startup_complete = False
+
+# Translation messages are deleted by a single worker from a persisted queue
+deletion_scheduler = DeletionScheduler(DeletionStore(BOT_DB_FILE, owner=CLUSTER_ID), bot.get_channel)
+metrics.PENDING_DELETIONS.set_function(lambda: len(deletion_scheduler))
 
 # Language dropdown
 class LanguageSelect(discord.ui.Select):
@@ -352,27 +697,19 @@ class LanguageSelect(discord.ui.Select):
             options=options
         )
 
+    @metrics.timed(metrics.HANDLER_LATENCY, handler="language_select")
     async def callback(self, interaction: discord.Interaction):
         user_id = str(interaction.user.id)
         selected_lang = self.values[0]
         
         # Check if user had a previous language configured
-        previous_lang = user_languages.get(user_id)
+        previous_lang = preferences.get(user_id)
         selected_lang_name = get_language_name(selected_lang)
         
         try:
-            # Update in memory
-            user_languages[user_id] = selected_lang
-            
-            # Save to file with validation
-            save_languages()
-            
-            # Verify that it was saved correctly
-            reloaded_data = load_languages()
-            if user_id not in reloaded_data or reloaded_data[user_id] != selected_lang:
-                # If validation fails, try to save again
-                logger.warning(f"⚠️ Validation failed for user {user_id}, retrying save")
-                save_languages()
+            # Single-row upsert, committed before we confirm to the user
+            if previous_lang != selected_lang:
+                await asyncio.to_thread(preferences.set, user_id, selected_lang)
             
             # Create response message based on whether user had previous configuration
             if previous_lang and previous_lang != selected_lang:
@@ -415,10 +752,16 @@ class ContextualLanguageMenu(discord.ui.View):
 @tasks.loop(minutes=10)
 async def periodic_save():
     try:
-        if user_languages:  # Only save if there is data
-            save_languages()
-        if translation_stats and any(g["total"] > 0 for g in translation_stats.values()):  # Only save if there are stats
-            save_stats()
+        # The export is shared by all clusters; one writer is enough
+        if CLUSTER_ID == 0:
+            languages = await asyncio.to_thread(preferences.as_dict)
+            if languages:  # Only export if there is data
+                await asyncio.to_thread(save_languages, languages)
+        await flush_stats()
+        removed = await asyncio.to_thread(translation_store.compact)
+        if removed:
+            logger.info(f"🗜️ Compacted translation store, removed {removed} old entries")
+        logger.info(f"🧹 Dedup index: {len(translated_messages)} entries (~{translated_messages.memory_bytes() // 1024} KB)")
         logger.info("🔄 Periodic save completed")
     except Exception as e:
         logger.error(f"❌ Error in periodic save: {e}")
@@ -427,13 +770,169 @@ async def periodic_save():
 async def before_periodic_save():
     await bot.wait_until_ready()
 
+# Write-behind flush of translation stats
+@tasks.loop(seconds=STATS_FLUSH_INTERVAL_SECONDS)
+async def flush_stats_task():
+    try:
+        await flush_stats()
+    except Exception as e:
+        logger.error(f"❌ Error flushing stats: {e}")
+
+@flush_stats_task.before_loop
+async def before_flush_stats_task():
+    await bot.wait_until_ready()
+
+# Periodic backend health checks; unhealthy backends are only used as a last resort
+@tasks.loop(minutes=BACKEND_HEALTH_CHECK_MINUTES)
+async def check_backends():
+    results = await translator.check_health()
+    unhealthy = [name for name, healthy in results.items() if not healthy]
+    if unhealthy:
+        logger.warning(f"⚠️ Unhealthy translation backends: {', '.join(unhealthy)}")
+
+@check_backends.before_loop
+async def before_check_backends():
+    await bot.wait_until_ready()
+
+# Captures the stack of whatever blocks the event loop past LOOP_STALL_THRESHOLD_SECONDS
+loop_watchdog = metrics.LoopWatchdog(threshold=LOOP_STALL_THRESHOLD_SECONDS)
+
+# Event loop lag sampler (also refreshes metrics that must be read on the loop)
+@tasks.loop(seconds=LOOP_LAG_SAMPLE_INTERVAL_SECONDS)
+async def sample_loop_lag():
+    lag = await metrics.measure_loop_lag()
+    metrics.LOOP_LAG.set(lag)
+    metrics.LOOP_LAG_HISTOGRAM.observe(lag)
+    metrics.DEDUP_MEMORY.set(translated_messages.memory_bytes())
+
+async def translate_or_log(parts, lang, message_id):
+    """Translate the MessageParts of a message, logging and counting failures; returns None on error."""
+    try:
+        return parts.translated(await translate_message_texts(parts.texts(), lang))
+    except asyncio.TimeoutError:
+        metrics.TRANSLATION_ERRORS.inc(reason="timeout")
+        logger.error(f"[Translation timeout] No response after {TRANSLATION_TIMEOUT_SECONDS}s for message {message_id} -> {lang}")
+    except TranslationQueueFull as e:
+        metrics.TRANSLATION_ERRORS.inc(reason="queue_full")
+        logger.warning(f"[Translation busy] {e}, dropping message {message_id} -> {lang}")
+    except NoBackendAvailable as e:
+        metrics.TRANSLATION_ERRORS.inc(reason="no_backend")
+        logger.error(f"[Translation error] {e}")
+    except Exception as e:
+        metrics.TRANSLATION_ERRORS.inc(reason="error")
+        logger.error(f"[Translation error] {e}")
+    return None
+
+def build_translation_embeds(message, translated, lang):
+    """Embeds for a translated CachedMessage: a header embed plus the message's own embeds."""
+    content = clip_text(translated.content, EMBED_LIMITS["description"])
+    embed = discord.Embed(description=content or None, color=discord.Color.blue())
+    embed.set_author(
+        name=f"{message.author_name} ({lang})",
+        icon_url=message.avatar_url
+    )
+    if translated.reply:
+        author, text = translated.reply
+        embed.add_field(name=clip_text(f"↪️ Replying to {author}", EMBED_LIMITS["field_name"]), value=clip_text(text, EMBED_LIMITS["field_value"]), inline=False)
+    for filename, text in translated.attachments:
+        embed.add_field(name=clip_text(f"🖼️ {filename}", EMBED_LIMITS["field_name"]), value=clip_text(text, EMBED_LIMITS["field_value"]), inline=False)
+    
+    # Translated copies of the message's own embeds follow the header embed, within
+    # Discord's total character limit: whatever doesn't fit at the end is trimmed or dropped
+    budget = EMBED_TOTAL_LIMIT
+    embeds = []
+    for data in [embed.to_dict()] + translated.embeds:
+        fitted = fit_embed(data, budget)
+        if fitted is None or len(embeds) == MAX_OUTPUT_EMBEDS:
+            break
+        budget -= embed_length(fitted)
+        embeds.append(discord.Embed.from_dict(fitted))
+    return embeds
+
+def is_language_menu(msg):
+    if msg.author != bot.user:
+        return False
+    if msg.content.startswith("🌐"):
+        return True
+    return any(embed.title and embed.title.startswith("🌐") for embed in msg.embeds)
+
+async def setup_language_menu(guild):
+    """Make sure #choose-language has the pinned language menu."""
+    channel = discord.utils.get(guild.text_channels, name="choose-language")
+    if not channel:
+        return
+    
+    # A menu we posted (or found) before: one fetch confirms it survived while we were offline
+    # (guilds already verified since startup are skipped by sweep_language_menus)
+    known = language_menus.get(guild.id)
+    if known and known[0] == channel.id:
+        try:
+            msg = await channel.fetch_message(known[1])
+            if msg.pinned:
+                return
+        except discord.NotFound:
+            pass
+        logger.info(f"📌 Stored language menu in {guild.name} is gone or unpinned, checking pins")
+    
+    pinned = await channel.pins()
+    for msg in pinned:
+        if is_language_menu(msg):
+            menu_message = msg
+            break
+    else:
+        embed = discord.Embed(
+            title="🌐 Language Configuration",
+            description=(
+                "**Select your preferred language using the dropdown below:**\n\n"
+                "• This will set your default language for translations\n"
+                "• You can change it anytime by using this menu\n"
+                "• Use `/language` to check your current setting"
+            ),
+            color=discord.Color.blue()
+        )
+        embed.set_footer(text="Your language setting is saved automatically")
+        menu_message = await channel.send(embed=embed, view=LanguageMenu())
+        await menu_message.pin()
+        logger.info(f"📌 Posted language menu in {guild.name}")
+    
+    language_menus[guild.id] = (channel.id, menu_message.id)
+    await asyncio.to_thread(menu_store.set, guild.id, channel.id, menu_message.id)
+
+async def sweep_language_menus(guilds):
+    """Set up language menus in many guilds with bounded concurrency."""
+    semaphore = asyncio.Semaphore(GUILD_SETUP_CONCURRENCY)
+    
+    async def setup(guild):
+        async with semaphore:
+            try:
+                await setup_language_menu(guild)
+                verified_guilds.add(guild.id)
+            except Exception as e:
+                logger.error(f"❌ Error setting up language menu in {guild.name}: {e}")
+    
+    pending = []
+    for guild in guilds:
+        # Only setup channels in allowed servers
+        if not is_server_allowed(guild.id):
+            logger.warning(f"⚠️ Skipping setup for unauthorized server: {guild.name} (ID: {guild.id})")
+            continue
+        if guild.id in verified_guilds:
+            continue
+        pending.append(setup(guild))
+    
+    if pending:
+        started = time.perf_counter()
+        await asyncio.gather(*pending)
+        logger.info(f"✅ Checked language menus in {len(pending)} servers in {time.perf_counter() - started:.1f}s")
+
 # Events
 @bot.event
+@metrics.timed(metrics.HANDLER_LATENCY, handler="on_ready")
 async def on_ready():
     logger.info(f"✅ Bot connected as {bot.user}")
     
     # Validate and show loaded configurations
-    logger.info(f"📊 Loaded configurations for {len(user_languages)} users")
+    logger.info(f"📊 Loaded configurations for {len(preferences)} users")
     
     # Log server whitelist status
     if ENABLE_SERVER_WHITELIST:
@@ -442,149 +941,250 @@ async def on_ready():
     else:
         logger.info("🌐 Server whitelist DISABLED - Bot will work in all servers")
     
-    # Sync slash commands with Discord
-    try:
-        synced = await bot.tree.sync()
-        logger.info(f"✅ Synced {len(synced)} slash command(s) with Discord")
-    except Exception as e:
-        logger.error(f"❌ Failed to sync commands: {e}")
+    # on_ready fires again after every reconnect; one-time setup only runs once
+    global startup_complete, guild_sweep_task
+    if not startup_complete:
+        startup_complete = True
+        
+        # Sync slash commands with Discord
+        try:
+            synced = await bot.tree.sync()
+            logger.info(f"✅ Synced {len(synced)} slash command(s) with Discord")
+        except Exception as e:
+            logger.error(f"❌ Failed to sync commands: {e}")
+        
+        bot.add_view(LanguageMenu())
     
     # Start periodic saving
     if not periodic_save.is_running():
         periodic_save.start()
         logger.info("🔄 Periodic save task started")
     
-    bot.add_view(LanguageMenu())
+    if not flush_stats_task.is_running():
+        flush_stats_task.start()
+        logger.info(f"🔄 Stats flush task started (every {STATS_FLUSH_INTERVAL_SECONDS}s)")
+    
+    if not sample_loop_lag.is_running():
+        sample_loop_lag.start()
+    loop_watchdog.start()
+    
+    if not check_backends.is_running():
+        check_backends.start()
+    
+    reaction_scheduler.start()
+    await deletion_scheduler.start()
+    
+    # Language menus are checked in the background so readiness doesn't wait on REST calls
+    if guild_sweep_task is None or guild_sweep_task.done():
+        guild_sweep_task = asyncio.create_task(sweep_language_menus(bot.guilds))
 
-    for guild in bot.guilds:
-        # Only setup channels in allowed servers
-        if not is_server_allowed(guild.id):
-            logger.warning(f"⚠️ Skipping setup for unauthorized server: {guild.name} (ID: {guild.id})")
-            continue
-            
-        channel = discord.utils.get(guild.text_channels, name="choose-language")
-        if channel:
-            pinned = await channel.pins()
-            for msg in pinned:
-                if msg.author == bot.user and msg.content.startswith("🌐"):
-                    break
-            else:
-                embed = discord.Embed(
-                    title="🌐 Language Configuration",
-                    description=(
-                        "**Select your preferred language using the dropdown below:**\n\n"
-                        "• This will set your default language for translations\n"
-                        "• You can change it anytime by using this menu\n"
-                        "• Use `/language` to check your current setting"
-                    ),
-                    color=discord.Color.blue()
-                )
-                embed.set_footer(text="Your language setting is saved automatically")
-                sent = await channel.send(embed=embed, view=LanguageMenu())
-                await sent.pin()
+@bot.event
+@metrics.timed(metrics.HANDLER_LATENCY, handler="on_shard_ready")
+async def on_shard_ready(shard_id):
+    logger.info(f"🧩 Shard {shard_id} ready")
+
+@bot.event
+@metrics.timed(metrics.HANDLER_LATENCY, handler="on_guild_join")
+async def on_guild_join(guild):
+    if is_server_allowed(guild.id):
+        await sweep_language_menus([guild])
+
+@bot.event
+@metrics.timed(metrics.HANDLER_LATENCY, handler="on_raw_message_edit")
+async def on_raw_message_edit(payload):
+    cached = message_cache.get(payload.message_id)
+    if cached is None:
+        return
+    # Link previews arrive as edits that leave the text alone; anything else refetches on the next reaction
+    content = payload.data.get("content")
+    embeds = payload.data.get("embeds", [])
+    if content is None or content_digest(content) != cached.digest or any(e.get("type") == "rich" for e in embeds):
+        message_cache.discard(payload.message_id)
+
+@bot.event
+@metrics.timed(metrics.HANDLER_LATENCY, handler="on_raw_message_delete")
+async def on_raw_message_delete(payload):
+    message_cache.discard(payload.message_id)
+    # If someone deletes a language menu, forget it and post a fresh one
+    if payload.guild_id is None:
+        return
+    known = language_menus.get(payload.guild_id)
+    if known and known[1] == payload.message_id:
+        language_menus.pop(payload.guild_id, None)
+        verified_guilds.discard(payload.guild_id)
+        await asyncio.to_thread(menu_store.remove, payload.guild_id)
+        guild = bot.get_guild(payload.guild_id)
+        if guild:
+            await sweep_language_menus([guild])
 
 @bot.event
+@metrics.timed(metrics.HANDLER_LATENCY, handler="on_message")
 async def on_message(message):
-    if message.author.bot:
+    if message.author == bot.user:
         return
 
     # Check if server is allowed
     if message.guild and not is_server_allowed(message.guild.id):
         return
 
-    await bot.process_commands(message)
+    # Other bots' and webhooks' announcements get a 🌍 too, but can't run commands
+    if not message.author.bot:
+        await bot.process_commands(message)
 
-    try:
-        if not message.webhook_id:
-            await message.add_reaction("🌍")
-    except Exception as e:
-        logger.error(f"[Reaction error] {e}")
+    # Remember what reactions will need, so most translations skip a fetch
+    parts = MessageParts(message)
+    if not parts:
+        return
+    message_cache.put(message, parts)
 
-@bot.event
-async def on_reaction_add(reaction, user):
-    if user.bot:
+    if not is_auto_react_enabled(message.channel.id):
         return
 
-    if str(reaction.emoji) != "🌍":
+    # Longer messages are the ones people actually translate; seed those first
+    length = sum(len(text) for text in parts.texts())
+    priority = 1 if length >= REACTION_SEED_MIN_PRIORITY_CHARS else 0
+    reaction_scheduler.submit(message, priority=priority)
+
+async def get_or_fetch_channel(channel_id):
+    """The channel from discord.py's cache, or fetched (e.g. threads it hasn't seen yet)."""
+    return bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+
+async def fetch_message(channel_id, message_id):
+    channel = await get_or_fetch_channel(channel_id)
+    return await channel.fetch_message(message_id)
+
+@bot.event
+@metrics.timed(metrics.HANDLER_LATENCY, handler="on_raw_reaction_add")
+async def on_raw_reaction_add(payload):
+    # Raw events fire for every message, not only the ones discord.py still has cached
+    if str(payload.emoji) != "🌍":
         return
 
-    message = reaction.message
+    user = payload.member
+    if payload.guild_id is None or user is None or user.bot:
+        return
     
     # Check if server is allowed
-    if message.guild and not is_server_allowed(message.guild.id):
+    if not is_server_allowed(payload.guild_id):
         return
-    
-    user_id = str(user.id)
 
-    if (message.id, user_id) not in translated_messages:
-        translated_messages.add((message.id, user_id))
+    await handle_translation_reaction(payload, user)
+
+@metrics.timed(metrics.REACTION_LATENCY)
+async def handle_translation_reaction(payload, user):
+    """Translate a message for the member who reacted with 🌍 (only these are timed as reactions)."""
+    guild = user.guild
+    user_id = str(user.id)
 
-    if user_id not in user_languages:
-        channel = discord.utils.get(message.guild.text_channels, name="choose-language")
+    lang = preferences.get(user_id)
+    if lang is None:
+        channel = discord.utils.get(guild.text_channels, name="choose-language")
         if channel:
             try:
                 user_status = get_user_language_status(user.id)
-                await channel.send(
+                prompt = await channel.send(
                     f"{user.mention} ❗ **Please select your language**\n"
                     f"📊 Status: {user_status}\n"
-                    f"👆 Use the menu above to configure your preferred language.",
-                    delete_after=15
+                    f"👆 Use the menu above to configure your preferred language."
                 )
+                await deletion_scheduler.schedule(channel.id, prompt.id, 15)
             except:
                 pass
         return
 
-    if user.id == message.author.id:
+    try:
+        message = await message_cache.get_or_fetch(
+            payload.message_id, lambda: fetch_message(payload.channel_id, payload.message_id)
+        )
+    except Exception as e:
+        logger.error(f"[Fetch error] Could not load message {payload.message_id}: {e}")
+        return
+
+    if user.id == message.author_id:
         return  # Silently ignore, without notification
 
-    lang = user_languages[user_id]
+    if not message.parts:
+        return
 
-    try:
-        translated = GoogleTranslator(source='auto', target=lang).translate(message.content)
-    except Exception as e:
-        logger.error(f"[Translation error] {e}")
+    # Same user re-reacting to the same message shortly after: already translated (or in progress)
+    if translated_messages.check_and_add(message.id, user.id):
         return
 
-    embed = discord.Embed(description=translated, color=discord.Color.blue())
-    embed.set_author(
-        name=f"{message.author.display_name} ({lang})",
-        icon_url=message.author.display_avatar.url
-    )
+    translated = await translate_or_log(message.parts, lang, message.id)
+    if translated is None:
+        # Nothing reached the user, so let a retry through
+        translated_messages.discard(message.id, user.id)
+        return
+
+    embeds = build_translation_embeds(message, translated, lang)
 
     # Calculate dynamic reading time based on translated text length
-    reading_time = calculate_reading_time(translated)
+    reading_time = calculate_reading_time(translated.plain_text())
     
     try:
-        sent_msg = await message.channel.send(content=user.mention, embed=embed, silent=True)
-        await sent_msg.delete(delay=reading_time)
+        channel = await get_or_fetch_channel(payload.channel_id)
+        with metrics.DISCORD_REST_LATENCY.time(call="send_translation"):
+            sent_msg = await channel.send(content=user.mention, embeds=embeds, silent=True)
     except Exception as e:
-        logger.error(f"[Send/delete error] {e}")
-
-    # Get guild stats (create if doesn't exist)
-    guild_id = message.guild.id
-    if guild_id not in translation_stats:
-        translation_stats[guild_id] = {
-            "total": 0,
-            "per_user": defaultdict(int),
-            "per_language": Counter()
-        }
+        translated_messages.discard(message.id, user.id)
+        logger.error(f"[Send error] {e}")
+        return
     
-    translation_stats[guild_id]["total"] += 1
-    translation_stats[guild_id]["per_user"][user.id] += 1
-    translation_stats[guild_id]["per_language"][lang] += 1
+    try:
+        await deletion_scheduler.schedule(sent_msg.channel.id, sent_msg.id, reading_time)
+    except Exception as e:
+        logger.error(f"[Delete scheduling error] {e}")
+
+    # Only translations that reached the user count towards stats
+    record_translation(payload.guild_id, user.id, lang)
     
     # Log translation activity
-    logger.info(f"🔄 Translation completed: {user.display_name} ({user.id}) -> {lang} in {message.guild.name} #{message.channel.name}")
+    logger.info(f"🔄 Translation completed: {user.display_name} ({user.id}) -> {lang} in {guild.name} #{getattr(channel, 'name', payload.channel_id)}")
+
+# Context menu: translate privately with a single ephemeral interaction reply
+@bot.tree.context_menu(name="Translate")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="translate_context_menu")
+async def translate_context_menu(interaction: discord.Interaction, message: discord.Message):
+    if interaction.guild and not is_server_allowed(interaction.guild.id):
+        await interaction.response.send_message("❌ This bot is not authorized to work in this server.", ephemeral=True)
+        return
+    
+    lang = preferences.get(interaction.user.id)
+    if lang is None:
+        await interaction.response.send_message(
+            "❗ **Please select your language** in #choose-language first.", ephemeral=True
+        )
+        return
     
-    # Save stats after each translation
+    cached = message_cache.put(message)
+    if not cached.parts:
+        await interaction.response.send_message("❌ This message has no text to translate.", ephemeral=True)
+        return
+    
+    # Cache hits finish well inside Discord's 3 second window and need no defer
+    translation = asyncio.ensure_future(translate_or_log(cached.parts, lang, message.id))
     try:
-        save_stats()
-    except Exception as e:
-        logger.error(f"❌ Error auto-saving stats: {e}")
+        translated = await asyncio.wait_for(asyncio.shield(translation), timeout=CONTEXT_MENU_DEFER_AFTER_SECONDS)
+        respond = interaction.response.send_message
+    except asyncio.TimeoutError:
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        translated = await translation
+        respond = interaction.followup.send
+    
+    if translated is None:
+        await respond("❌ Translation failed. Please try again in a moment.", ephemeral=True)
+        return
+    
+    await respond(embeds=build_translation_embeds(cached, translated, lang), ephemeral=True)
+    
+    if interaction.guild:
+        record_translation(interaction.guild.id, interaction.user.id, lang)
+    logger.info(f"🔄 Translation completed (context menu): {interaction.user.display_name} ({interaction.user.id}) -> {lang}")
 
 # Commands
 @bot.hybrid_command(name="stats", description="Show translation statistics")
-async def stats(ctx):
+@metrics.timed(metrics.HANDLER_LATENCY, handler="stats")
+async def stats(ctx, period: Literal["24h", "7d", "30d", "all"] = "all"):
     # Check if server is allowed
     if ctx.guild and not is_server_allowed(ctx.guild.id):
         await ctx.send("❌ This bot is not authorized to work in this server.", ephemeral=True)
@@ -596,39 +1196,49 @@ async def stats(ctx):
     
     # Get stats for this server only
     guild_id = ctx.guild.id
-    guild_stats = translation_stats.get(guild_id, {
-        "total": 0,
-        "per_user": defaultdict(int),
-        "per_language": Counter()
-    })
+    guild_stats = translation_stats.get(guild_id) or new_guild_stats()
+    
+    if period == "all":
+        per_language = guild_stats["per_language"]
+        title_suffix = ""
+    else:
+        # Answered from the hourly/daily buckets, not from lifetime counters
+        per_language = guild_stats["timeline"].per_language(period)
+        title_suffix = f" (last {period})"
     
-    total = guild_stats["total"]
-    users = len(guild_stats["per_user"])
-    top_langs = guild_stats["per_language"].most_common(5)
+    total = guild_stats["total"] if period == "all" else sum(per_language.values())
+    top_langs = per_language.most_common(5)
 
     # Server stats embed
-    embed = discord.Embed(title=f"📊 Translation Stats - {ctx.guild.name}", color=discord.Color.green())
+    embed = discord.Embed(title=f"📊 Translation Stats - {ctx.guild.name}{title_suffix}", color=discord.Color.green())
     embed.add_field(name="Total translations", value=str(total), inline=False)
-    embed.add_field(name="Users translated", value=str(users), inline=False)
+    if period == "all":
+        embed.add_field(name="Users translated", value=str(len(guild_stats["per_user"])), inline=False)
     embed.add_field(name="Top languages", value="\n".join([f"{l} - {c}" for l, c in top_langs]) or "None yet.")
-    embed.set_footer(text="💾 Stats are saved automatically after each translation")
+    embed.set_footer(text=f"💾 Stats are saved automatically every {STATS_FLUSH_INTERVAL_SECONDS} seconds")
     
     # If user is admin, show global stats across all servers
     if ctx.author.guild_permissions.administrator:
-        # Calculate global stats
-        global_total = sum(g["total"] for g in translation_stats.values())
-        global_users = set()
-        global_languages = Counter()
-        
-        for guild_data in translation_stats.values():
-            global_users.update(guild_data["per_user"].keys())
-            global_languages.update(guild_data["per_language"])
+        # Maintained incrementally, so this doesn't depend on the number of servers or users
+        if period == "all":
+            global_total = global_stats.total
+            global_top_langs = global_stats.top_languages()
+        else:
+            global_languages = global_stats.timeline.per_language(period)
+            global_total = sum(global_languages.values())
+            global_top_langs = global_languages.most_common(5)
         
-        global_top_langs = global_languages.most_common(5)
+        # With several clusters this process only holds its own shards' stats
+        if len(local_shards()) < SHARD_COUNT:
+            scope = f"Cluster {CLUSTER_ID} (shards {', '.join(map(str, local_shards()))} of {SHARD_COUNT})"
+            scope_footer = f"servers on cluster {CLUSTER_ID}"
+        else:
+            scope = "All Servers"
+            scope_footer = "all servers"
         
         # Global stats embed
         global_embed = discord.Embed(
-            title="🌐 Global Stats - All Servers", 
+            title=f"🌐 Global Stats - {scope}{title_suffix}", 
             color=discord.Color.blue()
         )
         global_embed.add_field(
@@ -641,23 +1251,25 @@ async def stats(ctx):
             value=str(len(translation_stats)), 
             inline=False
         )
-        global_embed.add_field(
-            name="Unique users", 
-            value=str(len(global_users)), 
-            inline=False
-        )
+        if period == "all":
+            global_embed.add_field(
+                name="Unique users", 
+                value=str(global_stats.unique_users), 
+                inline=False
+            )
         global_embed.add_field(
             name="Top languages (global)", 
             value="\n".join([f"{l} - {c}" for l, c in global_top_langs]) or "None yet.", 
             inline=False
         )
-        global_embed.set_footer(text="🔒 Admin view - Global statistics across all servers")
+        global_embed.set_footer(text=f"🔒 Admin view - Global statistics across {scope_footer}")
         
         await ctx.send(embeds=[embed, global_embed])
     else:
         await ctx.send(embed=embed)
 
 @bot.hybrid_command(name="resetstats", description="Reset translation statistics (Admin only)")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="resetstats")
 async def reset_stats(ctx):
     """Reset translation statistics for this server."""
     if not ctx.author.guild_permissions.administrator:
@@ -677,22 +1289,49 @@ async def reset_stats(ctx):
     old_total = translation_stats.get(guild_id, {}).get("total", 0)
     
     # Reset stats for this server
-    translation_stats[guild_id] = {
-        "total": 0,
-        "per_user": defaultdict(int),
-        "per_language": Counter()
-    }
+    translation_stats[guild_id] = new_guild_stats()
+    global_stats.rebuild(translation_stats)
+    dirty_stats_shards.add(shard_for_guild(guild_id))
     
     # Save to file
     try:
-        save_stats()
+        await flush_stats()
         await ctx.send(f"✅ Statistics reset successfully for this server! (Previous total: {old_total} translations)", ephemeral=True)
         logger.info(f"📊 Stats reset by {ctx.author.display_name} in {ctx.guild.name}")
     except Exception as e:
         await ctx.send(f"❌ Error resetting statistics: {e}", ephemeral=True)
         logger.error(f"❌ Error resetting stats: {e}")
 
+@bot.hybrid_command(name="autoreact", description="Turn automatic 🌍 reactions on or off in this channel (Admin only)")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="autoreact")
+async def auto_react(ctx, enabled: bool):
+    """Enable or disable reaction seeding for the current channel."""
+    if not ctx.guild:
+        await ctx.send("❌ This command can only be used in a server.", ephemeral=True)
+        return
+    
+    if not ctx.author.guild_permissions.administrator:
+        await ctx.send("❌ This command is for administrators only.", ephemeral=True)
+        return
+    
+    if not is_server_allowed(ctx.guild.id):
+        await ctx.send("❌ This bot is not authorized to work in this server.", ephemeral=True)
+        return
+    
+    try:
+        await asyncio.to_thread(channel_settings.set_auto_react, ctx.channel.id, enabled)
+        auto_react_overrides[ctx.channel.id] = enabled
+    except Exception as e:
+        await ctx.send(f"❌ Error saving channel setting: {e}", ephemeral=True)
+        logger.error(f"❌ Error saving auto-react setting: {e}")
+        return
+    
+    status = "enabled" if enabled else "disabled"
+    await ctx.send(f"✅ Automatic 🌍 reactions {status} in {ctx.channel.mention}. Users can still add 🌍 themselves.", ephemeral=True)
+    logger.info(f"🌍 Auto-react {status} by {ctx.author.display_name} in {ctx.guild.name} #{ctx.channel.name}")
+
 @bot.hybrid_command(name="listlanguages", description="List all user language configurations (Admin only)")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="listlanguages")
 async def list_languages(ctx):
     """List all users and their configured languages."""
     if not ctx.author.guild_permissions.administrator:
@@ -713,8 +1352,8 @@ async def list_languages(ctx):
     guild = ctx.guild
     configured_users = []
     
-    # Iterate over user_languages instead of guild.members (much faster)
-    for user_id_str, lang_code in user_languages.items():
+    # Iterate over configured users instead of guild.members (much faster)
+    for user_id_str, lang_code in preferences.items():
         try:
             user_id = int(user_id_str)
             # Try to get the member from this guild
@@ -790,6 +1429,7 @@ async def list_languages(ctx):
     logger.info(f"📋 Language list requested by {ctx.author.display_name} in {guild.name}")
 
 @bot.hybrid_command(name="language", description="Check or change your language setting")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="language")
 async def language_cmd(ctx):
     # Check if server is allowed
     if ctx.guild and not is_server_allowed(ctx.guild.id):
@@ -800,8 +1440,8 @@ async def language_cmd(ctx):
     
     embed = discord.Embed(title="🌍 Your Language Configuration", color=discord.Color.blue())
     
-    if user_id in user_languages:
-        current_lang = user_languages[user_id]
+    current_lang = preferences.get(user_id)
+    if current_lang:
         current_lang_name = get_language_name(current_lang)
         
         embed.add_field(
@@ -831,6 +1471,7 @@ async def language_cmd(ctx):
     await ctx.send(embed=embed, ephemeral=True)
 
 @bot.hybrid_command(name="logs", description="Test logging system (Admin only)")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="logs")
 async def logs_test(ctx):
     """Test command to verify logging system is working."""
     if not ctx.author.guild_permissions.administrator:
@@ -841,9 +1482,45 @@ async def logs_test(ctx):
     logger.warning("⚠️ This is a test warning message")
     logger.error("❌ This is a test error message")
     
-    await ctx.send("🧪 Log test completed! Check the logs/bot.log file and console output.", ephemeral=True)
+    await ctx.send(f"🧪 Log test completed! Check the {LOG_FILE} file and console output.", ephemeral=True)
+
+@bot.hybrid_command(name="hotpaths", description="Show handler timings and event loop stalls (Admin only)")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="hotpaths")
+async def hot_paths(ctx):
+    """Dump the per-handler latency histogram and the most recent event loop stalls."""
+    if not ctx.guild or not ctx.author.guild_permissions.administrator:
+        await ctx.send("❌ This command is for administrators only.", ephemeral=True)
+        return
+    
+    def format_rows(histogram, label):
+        rows = sorted(histogram.summary(), key=lambda row: row["mean"] * row["count"], reverse=True)
+        return "\n".join(
+            f"`{row['labels'].get(label, '?'):<22}` {row['count']:>6}× avg {row['mean'] * 1000:.0f}ms, p95 ≤{row['p95'] * 1000:.0f}ms"
+            for row in rows[:15]
+        ) or "No samples yet."
+    
+    embed = discord.Embed(title="🔥 Hot Paths", color=discord.Color.orange())
+    embed.add_field(name="Handlers (by total time)", value=format_rows(metrics.HANDLER_LATENCY, "handler")[:1024], inline=False)
+    embed.add_field(name="Discord REST", value=format_rows(metrics.DISCORD_REST_LATENCY, "call")[:1024], inline=False)
+    
+    lag = metrics.LOOP_LAG_HISTOGRAM.summary()
+    lag_text = f"now {metrics.LOOP_LAG.value() * 1000:.1f}ms"
+    if lag:
+        lag_text += f", p99 ≤{lag[0]['p99'] * 1000:.0f}ms over {lag[0]['count']} samples"
+    embed.add_field(name="Event loop lag", value=lag_text, inline=False)
+    
+    stalls = list(loop_watchdog.stalls)[-3:]
+    for stall in reversed(stalls):
+        when = datetime.fromtimestamp(stall["at"]).strftime("%H:%M:%S")
+        # The innermost frames are the ones doing the blocking
+        stack = stall["stack"][-900:]
+        embed.add_field(name=f"🐢 Blocked {stall['blocked_for']:.2f}s at {when}", value=f"```{stack}```", inline=False)
+    embed.set_footer(text=f"{int(metrics.LOOP_STALLS.value())} stalls over {LOOP_STALL_THRESHOLD_SECONDS}s since startup")
+    
+    await ctx.send(embed=embed, ephemeral=True)
 
 @bot.hybrid_command(name="serverid", description="Get the current server ID (Admin only)")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="serverid")
 async def serverid(ctx):
     """Get the server ID - useful for configuring the whitelist."""
     if not ctx.guild:
@@ -925,6 +1602,7 @@ async def serverid(ctx):
     logger.info(f"📋 Server ID requested by {ctx.author.display_name} in {ctx.guild.name} (ID: {ctx.guild.id})")
 
 @bot.hybrid_command(name="sync", description="Sync bot commands with Discord (Owner only)")
+@metrics.timed(metrics.HANDLER_LATENCY, handler="sync")
 async def sync_commands(ctx):
     """Manually sync slash commands with Discord."""
     if ctx.author.id != ctx.guild.owner_id and not ctx.author.guild_permissions.administrator:
@@ -947,3 +1625,8 @@ def run_bot():
         logger.error("❌ Token not found. Please set DISCORD_BOT_TOKEN.")
     else:
         bot.run(TOKEN)
+        # Flush anything recorded since the last write-behind pass
+        for shard_id in list(dirty_stats_shards):
+            save_stats(snapshot_stats(shard_id if SHARDED else None), stats_file_for_shard(shard_id))
+        if stats_files_to_retire:
+            retire_stale_stats_files()
@@ -1,5 +1,6 @@
-from flask import Flask
+from flask import Flask, Response
 from threading import Thread
+from metrics import registry
 
 app = Flask('')
 
@@ -7,5 +8,9 @@ app = Flask('')
 def home():
     return "Bot is alive!"
 
-def keep_alive():
-    Thread(target=lambda: app.run(host='0.0.0.0', port=8080)).start()
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
+def keep_alive(port=8080):
+    Thread(target=lambda: app.run(host='0.0.0.0', port=port)).start()
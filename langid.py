@@ -0,0 +1,138 @@
+import re
+from collections import OrderedDict
+
+# Very common function words per language. Detection counts how many of a
+# message's words appear in each list; it only needs to be good enough to
+# recognise messages that are clearly already in the reader's language.
+STOPWORDS = {
+    'en': "the be to of and a in that have it for not on with he as you do at this but his by from they we "
+          "say her she or an will my one all would there their what so up out if about who get which go me "
+          "is are was were i it's don't just your can".split(),
+    'es': "de la que el en y a los del se las por un para con no una su al lo como más pero sus le ya o "
+          "este sí porque esta entre cuando muy sin sobre también me hasta hay donde quien desde todo nos "
+          "es está son estoy yo tú qué".split(),
+    'pt': "de a o que e do da em um para é com não uma os no se na por mais as dos como mas foi ao ele "
+          "das tem à seu sua ou ser quando muito há nos já está eu também só pelo pela até isso você "
+          "são estou vocês".split(),
+    'fr': "de la le et les des en un du une que est pour qui dans a par plus pas au sur ne se ce il sont "
+          "avec ou son mais comme on tout nous sa elle je vous ils être c'est aux cette fait été très "
+          "suis ça oui".split(),
+    'de': "der die und in den von zu das mit sich des auf für ist im dem nicht ein eine als auch es an "
+          "werden aus er hat dass sie nach wird bei einer um am sind noch wie einem über einen so zum "
+          "ich du wir ihr bin".split(),
+    'it': "di e il la che a per un in è non una sono del della le si con da i mi ma lo anche al come "
+          "più se ha gli nel questo ci io tu alla dei delle o ne cosa perché molto sei".split(),
+    'pl': "i w nie na się z do to że a o jak ale co jest za po tak od jego już tylko przez czy mnie "
+          "by ja ty być dla jestem jeszcze może tego są było które bardzo ten ta".split(),
+    'tr': "ve bir bu da de için ile çok ne daha ama gibi o ben sen var yok mi mı mu mü olan kadar en "
+          "her şey değil olarak sonra biz siz onlar ki nasıl neden çünkü evet hayır".split(),
+    'cy': "y yr a i o yn ar ac mae ei am wedi bod fel gan ond hefyd neu roedd ydy dw i ti ni chi nhw "
+          "hi fe fo gyda oes dim sydd hyn hwn hon beth pam".split(),
+    'id': "yang dan di ini itu dengan untuk tidak dari dalam akan pada juga ke karena ada saya kamu kita "
+          "mereka adalah sudah bisa atau seperti oleh jika tapi apa belum lagi saja aku".split(),
+}
+
+# Letters that (almost) only one of the supported languages uses
+DISTINCTIVE_CHARS = {
+    'es': "ñ¿¡",
+    'pt': "ãõ",
+    'fr': "œëæ",
+    'de': "ß",
+    'pl': "łąęśźżń",
+    'tr': "ğış",
+    'cy': "ŵŷ",
+}
+
+WORD_PATTERN = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?", re.UNICODE)
+HAN_PATTERN = re.compile(r"[一-鿿]")
+KANA_PATTERN = re.compile(r"[぀-ヿ]")
+HANGUL_PATTERN = re.compile(r"[가-힯]")
+
+_STOPWORD_SETS = {lang: set(words) for lang, words in STOPWORDS.items()}
+
+# Words shared by several languages ("de", "a", "que") say less about which one it is
+_WORD_WEIGHTS = {}
+for _words in _STOPWORD_SETS.values():
+    for _word in _words:
+        _WORD_WEIGHTS[_word] = _WORD_WEIGHTS.get(_word, 0) + 1
+_WORD_WEIGHTS = {word: 1.0 / count for word, count in _WORD_WEIGHTS.items()}
+
+
+def detect_language(text, max_chars=1000):
+    """Guess the language of text; returns (language code, confidence 0..1) or (None, 0.0)."""
+    sample = text[:max_chars]
+
+    letters = [c for c in sample if c.isalpha()]
+    if not letters:
+        return None, 0.0
+
+    # Scripts first: these are unambiguous without any word lists
+    han = len(HAN_PATTERN.findall(sample))
+    kana = len(KANA_PATTERN.findall(sample))
+    hangul = len(HANGUL_PATTERN.findall(sample))
+    if kana and (kana + han) / len(letters) > 0.3:
+        return 'ja', min(1.0, (kana + han) / len(letters))
+    if hangul / len(letters) > 0.3:
+        return 'ko', min(1.0, hangul / len(letters))
+    if han / len(letters) > 0.3:
+        return 'zh-CN', min(1.0, han / len(letters))
+
+    words = [w.lower() for w in WORD_PATTERN.findall(sample)]
+    if not words:
+        return None, 0.0
+
+    scores = {
+        lang: sum(_WORD_WEIGHTS[w] for w in words if w in stopwords)
+        for lang, stopwords in _STOPWORD_SETS.items()
+    }
+    lowered = sample.lower()
+    for lang, chars in DISTINCTIVE_CHARS.items():
+        scores[lang] += 2 * sum(lowered.count(c) for c in chars)
+
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    (best, best_score), (_, second_score) = ranked[0], ranked[1]
+    if best_score == 0:
+        return None, 0.0
+
+    # Confidence combines how much of the text we recognised with the margin over the runner-up
+    coverage = min(1.0, best_score / max(1, len(words)) * 3)
+    margin = (best_score - second_score) / best_score
+    return best, coverage * margin
+
+
+class LanguageDetector:
+    """detect_language() with an LRU cache keyed by text, and a confidence gate."""
+
+    def __init__(self, min_confidence=0.4, min_words=4, max_entries=10000):
+        self.min_confidence = min_confidence
+        self.min_words = min_words
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def detect(self, text, cache_key=None):
+        """Return the detected language code, or None when not confident enough."""
+        key = cache_key if cache_key is not None else text
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+
+        self.misses += 1
+        lang, confidence = detect_language(text)
+        is_cjk = lang in ('zh-CN', 'ja', 'ko')
+        if lang is None or confidence < self.min_confidence:
+            lang = None
+        elif not is_cjk and len(WORD_PATTERN.findall(text[:1000])) < self.min_words:
+            # Too few words to tell e.g. Spanish from Portuguese reliably
+            lang = None
+
+        self._cache[key] = lang
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return lang
+
+    def is_same_language(self, text, target, cache_key=None):
+        detected = self.detect(text, cache_key)
+        return detected is not None and detected.split('-')[0].lower() == target.split('-')[0].lower()
@@ -0,0 +1,78 @@
+import logging
+import os
+import subprocess
+import sys
+import time
+
+logger = logging.getLogger('discord_translator.launcher')
+
+KEEP_ALIVE_PORT = 8080          # Cluster N serves keep_alive/metrics on KEEP_ALIVE_PORT + N
+RESTART_DELAY_SECONDS = 10      # Wait before restarting a cluster that exited
+
+
+def shard_ids_for_cluster(cluster_id, shard_count, cluster_count):
+    """Spread shards round-robin across clusters."""
+    return list(range(cluster_id, shard_count, cluster_count))
+
+
+def run_cluster():
+    """Entry point of a single bot process (reads its shard config from the environment)."""
+    from keep_alive import keep_alive
+    from bot2 import run_bot
+
+    keep_alive(port=KEEP_ALIVE_PORT + int(os.getenv("CLUSTER_ID", "0")))
+    run_bot()
+
+
+def spawn_cluster(cluster_id, shard_count, cluster_count):
+    shard_ids = shard_ids_for_cluster(cluster_id, shard_count, cluster_count)
+    env = dict(
+        os.environ,
+        SHARD_COUNT=str(shard_count),
+        SHARD_IDS=",".join(str(shard_id) for shard_id in shard_ids),
+        CLUSTER_ID=str(cluster_id)
+    )
+    logger.info(f"🚀 Starting cluster {cluster_id} with shards {shard_ids}")
+    return subprocess.Popen([sys.executable, "-c", "import launcher; launcher.run_cluster()"], env=env)
+
+
+def main():
+    """Run the bot: in-process for one cluster, otherwise one supervised process per cluster.
+
+    SHARD_COUNT sets the total number of gateway shards (1 = unsharded).
+    CLUSTER_COUNT sets how many processes share them.
+    """
+    # Only the launcher's own logger: bot2 configures discord_translator itself
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    shard_count = max(1, int(os.getenv("SHARD_COUNT", "1")))
+    cluster_count = max(1, min(int(os.getenv("CLUSTER_COUNT", "1")), shard_count))
+
+    if cluster_count == 1:
+        run_cluster()
+        return
+
+    clusters = {cluster_id: spawn_cluster(cluster_id, shard_count, cluster_count) for cluster_id in range(cluster_count)}
+    try:
+        while True:
+            time.sleep(1)
+            for cluster_id, process in list(clusters.items()):
+                code = process.poll()
+                if code is None:
+                    continue
+                logger.error(f"❌ Cluster {cluster_id} exited with code {code}, restarting in {RESTART_DELAY_SECONDS}s")
+                time.sleep(RESTART_DELAY_SECONDS)
+                clusters[cluster_id] = spawn_cluster(cluster_id, shard_count, cluster_count)
+    except KeyboardInterrupt:
+        logger.info("🛑 Stopping clusters")
+        for process in clusters.values():
+            process.terminate()
+        for process in clusters.values():
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,3 @@
-from keep_alive import keep_alive
-from bot2 import run_bot
+from launcher import main
 
-keep_alive()
-run_bot()
-# Agora, executa o bot diretamente (código dentro de bot2.py já faz isto)
+main()
@@ -0,0 +1,223 @@
+from collections import OrderedDict
+
+from translation import SingleFlight, text_digest
+
+# Discord limits for the embed parts we rebuild; translations can come back longer than the original
+EMBED_LIMITS = {
+    "title": 256,
+    "description": 4096,
+    "author": 256,
+    "footer": 2048,
+    "field_name": 256,
+    "field_value": 1024,
+}
+MAX_OUTPUT_EMBEDS = 10          # Discord allows 10 embeds per message
+EMBED_TOTAL_LIMIT = 6000        # Characters across all embeds of one message
+
+
+def clip_text(text, limit):
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+
+def embed_length(data):
+    """Characters of an embed dict that count towards EMBED_TOTAL_LIMIT."""
+    total = len(data.get("title", "")) + len(data.get("description", ""))
+    total += len(data.get("author", {}).get("name", "")) + len(data.get("footer", {}).get("text", ""))
+    total += sum(len(f.get("name", "")) + len(f.get("value", "")) for f in data.get("fields", []))
+    return total
+
+
+def fit_embed(data, budget):
+    """Trim an embed dict to at most `budget` characters; returns None if it can't fit.
+
+    Trailing fields go first, then the description is clipped.
+    """
+    data = dict(data, fields=list(data.get("fields", [])))
+    while embed_length(data) > budget and data["fields"]:
+        data["fields"].pop()
+    excess = embed_length(data) - budget
+    if excess > 0 and data.get("description"):
+        keep = len(data["description"]) - excess
+        if keep > 1:
+            data["description"] = clip_text(data["description"], keep)
+        else:
+            del data["description"]
+    return data if embed_length(data) <= budget else None
+
+
+class TranslatedParts:
+    """Translated pieces of a message, ready to be put into embeds."""
+
+    def __init__(self, content, reply, attachments, embeds):
+        self.content = content          # translated message text (or "")
+        self.reply = reply              # (author name, translated text) or None
+        self.attachments = attachments  # [(filename, translated alt text)]
+        self.embeds = embeds            # translated embed dicts, for discord.Embed.from_dict
+
+    def plain_text(self):
+        """All translated text joined together, for the reading time."""
+        pieces = [self.content]
+        if self.reply:
+            pieces.append(self.reply[1])
+        pieces.extend(text for _, text in self.attachments)
+        for embed in self.embeds:
+            pieces.extend([embed.get("title", ""), embed.get("description", "")])
+            pieces.extend(f"{f.get('name', '')} {f.get('value', '')}" for f in embed.get("fields", []))
+        return "\n".join(piece for piece in pieces if piece)
+
+
+class MessageParts:
+    """Every translatable piece of text in a message, and where it came from.
+
+    Covers the message content, the text of the message it replies to,
+    attachment alt text and rich embeds (title, description, author, fields,
+    footer). texts() lists them so they can be translated together;
+    translated() puts the results back where they belong.
+    """
+
+    def __init__(self, message, max_embeds=MAX_OUTPUT_EMBEDS - 1, reply_max_chars=300):
+        self._slots = []
+        self._texts = []
+        self._embeds = []
+        self._reply_author = None
+
+        if message.content:
+            self._add(("content",), message.content)
+
+        reference = getattr(message, "reference", None)
+        replied = getattr(reference, "resolved", None) if reference else None
+        if getattr(replied, "content", None):
+            self._reply_author = replied.author.display_name
+            self._add(("reply",), clip_text(replied.content, reply_max_chars))
+
+        for attachment in message.attachments:
+            if getattr(attachment, "description", None):
+                self._add(("attachment", attachment.filename), attachment.description)
+
+        # Only embeds a bot or webhook wrote; link previews are left alone
+        rich = [embed for embed in message.embeds if embed.type == "rich"][:max_embeds]
+        for index, embed in enumerate(rich):
+            data = embed.to_dict()
+            self._embeds.append(data)
+            for key in ("title", "description"):
+                if data.get(key):
+                    self._add(("embed", index, key), data[key])
+            if data.get("author", {}).get("name"):
+                self._add(("embed", index, "author"), data["author"]["name"])
+            if data.get("footer", {}).get("text"):
+                self._add(("embed", index, "footer"), data["footer"]["text"])
+            for position, field in enumerate(data.get("fields", [])):
+                if field.get("name"):
+                    self._add(("embed", index, "field_name", position), field["name"])
+                if field.get("value"):
+                    self._add(("embed", index, "field_value", position), field["value"])
+
+    def _add(self, slot, text):
+        self._slots.append(slot)
+        self._texts.append(text)
+
+    def __bool__(self):
+        return bool(self._texts)
+
+    def texts(self):
+        return list(self._texts)
+
+    def translated(self, translations):
+        """Map translations (in texts() order) back onto the message layout."""
+        content = ""
+        reply = None
+        attachments = []
+        embeds = [dict(data, fields=[dict(f) for f in data.get("fields", [])]) for data in self._embeds]
+
+        for slot, original, text in zip(self._slots, self._texts, translations):
+            text = text or original
+            kind = slot[0]
+            if kind == "content":
+                content = text
+            elif kind == "reply":
+                reply = (self._reply_author, text)
+            elif kind == "attachment":
+                attachments.append((slot[1], text))
+            else:
+                _, index, part = slot[:3]
+                embed = embeds[index]
+                if part in ("title", "description"):
+                    embed[part] = clip_text(text, EMBED_LIMITS[part])
+                elif part == "author":
+                    embed["author"] = dict(embed["author"], name=clip_text(text, EMBED_LIMITS[part]))
+                elif part == "footer":
+                    embed["footer"] = dict(embed["footer"], text=clip_text(text, EMBED_LIMITS[part]))
+                else:
+                    key = "name" if part == "field_name" else "value"
+                    embed["fields"][slot[3]][key] = clip_text(text, EMBED_LIMITS[part])
+
+        return TranslatedParts(content, reply, attachments, embeds)
+
+
+class CachedMessage:
+    """The parts of a message needed to translate it, without the discord.py object."""
+
+    __slots__ = ("id", "channel_id", "guild_id", "author_id", "author_name", "avatar_url", "digest", "parts")
+
+    def __init__(self, message, parts=None):
+        self.id = message.id
+        self.channel_id = message.channel.id
+        self.guild_id = message.guild.id if message.guild else None
+        self.author_id = message.author.id
+        self.author_name = message.author.display_name
+        self.avatar_url = message.author.display_avatar.url
+        self.parts = parts if parts is not None else MessageParts(message)
+        self.digest = content_digest(message.content)
+
+
+def content_digest(content):
+    return text_digest(content or "")
+
+
+class MessageCache:
+    """Bounded LRU of CachedMessage by message id, filled lazily on a miss.
+
+    Replaces discord.py's message cache for translations: reactions on
+    messages it doesn't hold are served by fetching the message once, with
+    concurrent misses for the same message sharing a single fetch.
+    """
+
+    def __init__(self, max_entries=5000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._fetches = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def put(self, message, parts=None):
+        cached = CachedMessage(message, parts)
+        self._entries[cached.id] = cached
+        self._entries.move_to_end(cached.id)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return cached
+
+    def get(self, message_id):
+        cached = self._entries.get(message_id)
+        if cached is not None:
+            self._entries.move_to_end(message_id)
+        return cached
+
+    def discard(self, message_id):
+        self._entries.pop(message_id, None)
+
+    async def get_or_fetch(self, message_id, fetch):
+        """Return the cached message, or await fetch() (a discord.Message) and cache it."""
+        cached = self.get(message_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        async def load():
+            self.misses += 1
+            return self.put(await fetch())
+
+        return await self._fetches.do(message_id, load)
@@ -0,0 +1,300 @@
+import asyncio
+import functools
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from contextlib import contextmanager
+
+logger = logging.getLogger('discord_translator')
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return "{" + pairs + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value, optionally split by labels."""
+    kind = "counter"
+
+    def __init__(self, name, documentation, callback=None):
+        super().__init__(name, documentation)
+        self._values = {}
+        self._callback = callback
+
+    def set_function(self, callback):
+        """Read the value from an existing counter (e.g. cache stats) on scrape."""
+        self._callback = callback
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def _samples(self):
+        if self._callback is not None:
+            return [f"{self.name} {_format_value(self._callback())}"]
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(Metric):
+    """Value that goes up and down; can be computed on scrape with a callback."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, callback=None):
+        super().__init__(name, documentation)
+        self._value = 0.0
+        self._callback = callback
+
+    def set(self, value):
+        self._value = value
+
+    def set_function(self, callback):
+        self._callback = callback
+
+    def value(self):
+        if self._callback is not None:
+            try:
+                return self._callback()
+            except Exception:
+                return float("nan")
+        return self._value
+
+    def _samples(self):
+        return [f"{self.name} {_format_value(self.value())}"]
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets, optionally split by labels."""
+    kind = "histogram"
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+                    break
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def summary(self):
+        """Per label set: count, mean and approximate p50/p95/p99 (bucket upper bounds)."""
+        with self._lock:
+            items = [(dict(key), list(s["counts"]), s["sum"], s["count"]) for key, s in self._series.items()]
+        result = []
+        for labels, counts, total, count in items:
+            if not count:
+                continue
+            quantiles = {}
+            for q in (0.5, 0.95, 0.99):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    if cumulative >= q * count:
+                        quantiles[q] = bound
+                        break
+            result.append({"labels": labels, "count": count, "mean": total / count,
+                           "p50": quantiles[0.5], "p95": quantiles[0.95], "p99": quantiles[0.99]})
+        return result
+
+    def _samples(self):
+        lines = []
+        with self._lock:
+            items = [(key, list(s["counts"]), s["sum"], s["count"]) for key, s in self._series.items()]
+        for key, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = key + (("le", _format_value(bound)),)
+                lines.append(f"{self.name}_bucket{_format_labels(labels)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {count}")
+        return lines
+
+
+class Registry:
+    """Collects metrics and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+def timed(histogram, **labels):
+    """Decorator that records how long a coroutine function takes."""
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with histogram.time(**labels):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class LoopWatchdog:
+    """Thread that notices when the event loop is blocked and records where.
+
+    A loop task touches a heartbeat every `interval` seconds. If the heartbeat
+    goes stale for longer than `threshold`, the watchdog captures the loop
+    thread's stack (the code that is blocking it), logs it once per stall and
+    keeps the last `keep` stalls for inspection.
+    """
+
+    def __init__(self, threshold=0.5, interval=0.1, keep=20):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = deque(maxlen=keep)
+        self._heartbeat = time.monotonic()
+        self._loop_thread_id = None
+        self._thread = None
+        self._task = None
+        self._stop = threading.Event()
+
+    def start(self):
+        if self._task is not None and not self._task.done():
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._task = asyncio.ensure_future(self._beat())
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+
+    async def _beat(self):
+        while True:
+            self._heartbeat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        reported = None
+        while not self._stop.wait(self.interval):
+            heartbeat = self._heartbeat
+            blocked_for = time.monotonic() - heartbeat
+            if blocked_for < self.threshold or reported == heartbeat:
+                continue
+            # One report per stall, taken while the loop is still stuck
+            reported = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame is not None else "(no frame)"
+            self.stalls.append({"at": time.time(), "blocked_for": blocked_for, "stack": stack})
+            LOOP_STALLS.inc()
+            logger.warning(f"🐢 Event loop blocked for {blocked_for:.2f}s in:\n{stack}")
+
+
+async def measure_loop_lag(delay=0.1):
+    """Sleep for `delay` and return how much later than requested the loop woke us."""
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await asyncio.sleep(delay)
+    return max(0.0, loop.time() - started - delay)
+
+
+registry = Registry()
+
+TRANSLATION_LATENCY = registry.register(Histogram(
+    "translator_translation_latency_seconds", "Time spent waiting for the translation backend"))
+TRANSLATION_ERRORS = registry.register(Counter(
+    "translator_provider_errors_total", "Failed translation requests by reason"))
+CACHE_HITS = registry.register(Counter(
+    "translator_cache_hits_total", "Translation cache hits"))
+CACHE_MISSES = registry.register(Counter(
+    "translator_cache_misses_total", "Translation cache misses"))
+CACHE_EVICTIONS = registry.register(Counter(
+    "translator_cache_evictions_total", "Translation cache evictions"))
+CACHE_HIT_RATE = registry.register(Gauge(
+    "translator_cache_hit_rate", "Fraction of translation lookups served from memory"))
+QUEUE_DEPTH = registry.register(Gauge(
+    "translator_queue_depth", "Translations running or waiting for a worker"))
+DEDUP_MEMORY = registry.register(Gauge(
+    "translator_dedup_memory_bytes", "Approximate memory held by the recent translations index"))
+LOOP_LAG = registry.register(Gauge(
+    "translator_event_loop_lag_seconds", "Most recent event loop lag sample"))
+LOOP_LAG_HISTOGRAM = registry.register(Histogram(
+    "translator_event_loop_lag_distribution_seconds", "Event loop lag samples"))
+REACTION_LATENCY = registry.register(Histogram(
+    "translator_reaction_handling_seconds", "Time to handle a translation reaction end to end"))
+SAVE_DURATION = registry.register(Histogram(
+    "translator_save_duration_seconds", "Time spent writing data files"))
+GATEWAY_LATENCY = registry.register(Gauge(
+    "translator_gateway_latency_seconds", "Discord gateway heartbeat latency"))
+REACTIONS_SEEDED = registry.register(Counter(
+    "translator_reactions_seeded_total", "Reaction seeding outcomes by result"))
+REACTION_BACKLOG = registry.register(Gauge(
+    "translator_reaction_backlog", "Messages waiting for a seeded reaction"))
+PENDING_DELETIONS = registry.register(Gauge(
+    "translator_pending_deletions", "Translation messages waiting to be deleted"))
+BACKEND_REQUESTS = registry.register(Counter(
+    "translator_backend_requests_total", "Translation backend calls by backend and result"))
+SAME_LANGUAGE_SKIPS = registry.register(Counter(
+    "translator_same_language_skips_total", "Translations skipped because the text is already in the target language"))
+MESSAGE_CACHE_ENTRIES = registry.register(Gauge(
+    "translator_message_cache_entries", "Messages held in the translation message cache"))
+MESSAGE_CACHE_MISSES = registry.register(Counter(
+    "translator_message_cache_misses_total", "Reactions on uncached messages that needed a fetch"))
+HANDLER_LATENCY = registry.register(Histogram(
+    "translator_handler_seconds", "Time spent in each event handler and command"))
+DISCORD_REST_LATENCY = registry.register(Histogram(
+    "translator_discord_rest_seconds", "Time spent waiting for Discord REST calls"))
+LOOP_STALLS = registry.register(Counter(
+    "translator_event_loop_stalls_total", "Times the event loop was blocked past the watchdog threshold"))
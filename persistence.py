@@ -0,0 +1,87 @@
+import gzip
+import json
+import os
+import tempfile
+
+# Bump when the layout of the "data" payload changes
+FORMAT_VERSION = 1
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class PersistenceError(Exception):
+    """Raised when a data file exists but cannot be decoded."""
+
+
+def _fsync_directory(path):
+    """Make the rename itself durable (no-op where directories can't be opened)."""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, data, kind, compress=False):
+    """Write data to path so readers only ever see the old or the new file.
+
+    The payload is wrapped in a versioned envelope, written to a temporary
+    file, fsynced and then moved over the live file with os.replace().
+    """
+    payload = {"format": kind, "version": FORMAT_VERSION, "data": data}
+    raw = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if compress:
+        raw = gzip.compress(raw)
+
+    # Unique temp file in the same directory, so concurrent writers never share one
+    fd, temp_path = tempfile.mkstemp(prefix=f"{os.path.basename(path)}.", suffix=".tmp",
+                                     dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file owner-only; keep the usual permissions of data files
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except Exception:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(path)
+    return len(raw)
+
+
+def read_json(path, kind):
+    """Read a file written by atomic_write_json() (or a legacy plain JSON file).
+
+    Raises FileNotFoundError if the file doesn't exist and PersistenceError if
+    it can't be decoded.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+
+    try:
+        if raw[:2] == GZIP_MAGIC:
+            raw = gzip.decompress(raw)
+        payload = json.loads(raw.decode("utf-8"))
+    except (OSError, EOFError, UnicodeDecodeError, ValueError) as e:
+        raise PersistenceError(f"{path} is corrupted: {e}") from e
+
+    # Files written before the versioned format are the bare data dict
+    if not (isinstance(payload, dict) and "format" in payload and "version" in payload):
+        return payload
+
+    if payload["format"] != kind:
+        raise PersistenceError(f"{path} contains {payload['format']!r} data, expected {kind!r}")
+    if payload["version"] > FORMAT_VERSION:
+        raise PersistenceError(f"{path} was written by a newer version (format v{payload['version']})")
+    return payload["data"]
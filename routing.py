@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+from collections import deque
+
+from backends import NoBackendAvailable
+from translation import TranslationQueueFull
+
+logger = logging.getLogger('discord_translator')
+
+
+class CircuitBreaker:
+    """Stops sending requests to a failing backend, with exponential backoff.
+
+    After `failure_threshold` consecutive failures the circuit opens for
+    `backoff` seconds; then a single trial request is let through (half-open).
+    A failed trial doubles the backoff up to `max_backoff`.
+    """
+
+    def __init__(self, failure_threshold=3, base_backoff=5.0, max_backoff=300.0):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.backoff = base_backoff
+        self.state = "closed"
+        self.open_until = 0.0
+
+    def available(self):
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            return time.monotonic() >= self.open_until
+        # Half-open: the trial request is already in flight
+        return False
+
+    def on_request(self):
+        if self.state == "open":
+            self.state = "half_open"
+
+    def release_trial(self):
+        """The trial request ended without an answer (e.g. cancelled); allow another one."""
+        if self.state == "half_open":
+            self.state = "open"
+
+    def record_success(self):
+        self.failures = 0
+        self.backoff = self.base_backoff
+        self.state = "closed"
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state == "half_open":
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+            self.state = "open"
+            self.open_until = time.monotonic() + self.backoff
+            return True
+        return False
+
+
+class LatencyTracker:
+    """EWMA of request latency plus a window of recent samples for percentiles."""
+
+    def __init__(self, alpha=0.2, window=200):
+        self.alpha = alpha
+        self.ewma = None
+        self._samples = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.ewma = seconds if self.ewma is None else self.alpha * seconds + (1 - self.alpha) * self.ewma
+        self._samples.append(seconds)
+
+    def percentile(self, fraction):
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class BackendRouter:
+    """Routes translations across backends with failover, circuit breakers and hedging.
+
+    Candidates are ordered by health, cost and EWMA latency. If the first
+    backend hasn't answered by its `hedge_percentile` latency, the request is
+    hedged to the next one and whichever succeeds first wins; a failure fails
+    over to the next candidate immediately.
+    """
+
+    def __init__(self, executor, hedge_percentile=0.95, min_hedge_delay=0.25, max_hedge_delay=3.0,
+                 failure_threshold=3, base_backoff=5.0, max_backoff=300.0, on_result=None):
+        self.executor = executor
+        self.backends = executor.backends
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.breaker_options = dict(failure_threshold=failure_threshold, base_backoff=base_backoff, max_backoff=max_backoff)
+        self.on_result = on_result
+        self.breakers = {}
+        self.latency = {}
+        self.hedges = 0
+
+    def _breaker(self, backend):
+        if backend.name not in self.breakers:
+            self.breakers[backend.name] = CircuitBreaker(**self.breaker_options)
+        return self.breakers[backend.name]
+
+    def _tracker(self, backend):
+        if backend.name not in self.latency:
+            self.latency[backend.name] = LatencyTracker()
+        return self.latency[backend.name]
+
+    def _record(self, backend, result):
+        if self.on_result is not None:
+            self.on_result(backend.name, result)
+
+    def _hedge_delay(self, backend):
+        observed = self._tracker(backend).percentile(self.hedge_percentile)
+        if observed is None:
+            return self.max_hedge_delay
+        return min(self.max_hedge_delay, max(self.min_hedge_delay, observed))
+
+    def candidates(self, source, target):
+        def ewma(backend):
+            value = self._tracker(backend).ewma
+            return float("inf") if value is None else value
+        ordered = sorted(self.backends.candidates(source, target), key=lambda b: (not b.healthy, b.cost, ewma(b)))
+        return [b for b in ordered if self._breaker(b).available()]
+
+    async def _call(self, backend, texts, source, target):
+        breaker = self._breaker(backend)
+        breaker.on_request()
+        started = time.monotonic()
+        try:
+            results = await self.executor.run_batch(backend, texts, source, target)
+        except asyncio.CancelledError:
+            # Lost a hedge race: the elapsed time is still a lower bound on its latency
+            self._tracker(backend).observe(time.monotonic() - started)
+            breaker.release_trial()
+            raise
+        except TranslationQueueFull:
+            breaker.release_trial()
+            raise
+        except Exception:
+            if breaker.record_failure():
+                logger.warning(f"⚡ Circuit opened for backend {backend.name} for {breaker.backoff:.0f}s")
+            self._record(backend, "error")
+            raise
+        self._tracker(backend).observe(time.monotonic() - started)
+        breaker.record_success()
+        self._record(backend, "success")
+        return results
+
+    async def translate(self, text, target, source='auto'):
+        return (await self.translate_batch([text], target, source))[0]
+
+    async def translate_batch(self, texts, target, source='auto'):
+        remaining = self.candidates(source, target)
+        if not remaining:
+            raise NoBackendAvailable(f"All backends for {source} -> {target} are unavailable (circuits open)")
+
+        pending = {}
+        last_error = None
+
+        def launch():
+            backend = remaining.pop(0)
+            task = asyncio.ensure_future(self._call(backend, texts, source, target))
+            pending[task] = backend
+            return backend
+
+        current = launch()
+        try:
+            while pending:
+                timeout = self._hedge_delay(current) if remaining else None
+                done, _ = await asyncio.wait(pending.keys(), timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than usual: race the next backend against the one in flight
+                    self.hedges += 1
+                    self._record(current, "hedged")
+                    current = launch()
+                    continue
+
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                    if isinstance(last_error, TranslationQueueFull):
+                        raise last_error
+
+                # A backend failed: fail over right away instead of waiting for a hedge
+                if remaining:
+                    current = launch()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,283 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+
+logger = logging.getLogger('discord_translator')
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, up to `capacity` stored."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token; returns 0 on success or the seconds to wait for the next one."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    @property
+    def idle(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+class ReactionScheduler:
+    """Seeds reactions on messages without exceeding per-channel rate limits.
+
+    Ready messages wait in a heap ordered by priority; messages deferred by a
+    rate limit or by `is_busy()` wait in a second heap ordered by ready time.
+    A single worker takes a token from the message's channel bucket before
+    each REST call, skips messages older than `max_age` seconds, sheds
+    low-priority messages once the backlog passes `low_priority_backlog`,
+    and backs off while `is_busy()` reports that translations need the REST
+    budget.
+    """
+
+    def __init__(self, emoji, rate=1.0, burst=2, max_age=30.0, max_backlog=500,
+                 low_priority_backlog=100, is_busy=None, busy_delay=0.5, on_result=None):
+        self.emoji = emoji
+        self.rate = rate
+        self.burst = burst
+        self.max_age = max_age
+        self.max_backlog = max_backlog
+        self.low_priority_backlog = low_priority_backlog
+        self.is_busy = is_busy or (lambda: False)
+        self.busy_delay = busy_delay
+        self.on_result = on_result
+        self._ready = []
+        self._delayed = []
+        self._buckets = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self.results = {"added": 0, "dropped_old": 0, "dropped_backlog": 0, "error": 0}
+
+    def __len__(self):
+        return len(self._ready) + len(self._delayed)
+
+    def _record(self, result):
+        self.results[result] += 1
+        if self.on_result is not None:
+            self.on_result(result)
+
+    def submit(self, message, priority=0):
+        """Queue a message for seeding; higher priority goes first. Returns False if dropped."""
+        backlog = len(self)
+        if backlog >= self.max_backlog or (priority <= 0 and backlog >= self.low_priority_backlog):
+            self._record("dropped_backlog")
+            return False
+        heapq.heappush(self._ready, (-priority, next(self._seq), time.monotonic(), message))
+        self._wakeup.set()
+        return True
+
+    def start(self):
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def _bucket(self, channel_id):
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            # Forget idle channels so the bucket map doesn't grow forever
+            if len(self._buckets) > 1000:
+                self._buckets = {cid: b for cid, b in self._buckets.items() if not b.idle}
+            bucket = self._buckets[channel_id] = TokenBucket(self.rate, self.burst)
+        return bucket
+
+    async def _wait(self, timeout=None):
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _defer(self, delay, entry):
+        heapq.heappush(self._delayed, (time.monotonic() + delay, entry))
+
+    async def _run(self):
+        while True:
+            now = time.monotonic()
+            while self._delayed and self._delayed[0][0] <= now:
+                heapq.heappush(self._ready, heapq.heappop(self._delayed)[1])
+
+            if not self._ready:
+                timeout = self._delayed[0][0] - now if self._delayed else None
+                await self._wait(timeout)
+                continue
+
+            entry = heapq.heappop(self._ready)
+            _, _, enqueued_at, message = entry
+
+            if now - enqueued_at > self.max_age:
+                self._record("dropped_old")
+                continue
+
+            if self.is_busy():
+                self._defer(self.busy_delay, entry)
+                continue
+
+            wait = self._bucket(message.channel.id).try_acquire()
+            if wait > 0:
+                self._defer(wait, entry)
+                continue
+
+            try:
+                await message.add_reaction(self.emoji)
+                self._record("added")
+            except Exception as e:
+                self._record("error")
+                logger.error(f"[Reaction error] {e}")
+
+
+DISCORD_EPOCH_MS = 1420070400000
+BULK_DELETE_MAX_AGE_SECONDS = 14 * 24 * 3600 - 3600  # Discord refuses bulk deletes of messages older than 14 days
+
+
+def snowflake_age(snowflake_id):
+    """Seconds since the Discord object with this id was created."""
+    created_ms = (int(snowflake_id) >> 22) + DISCORD_EPOCH_MS
+    return time.time() - created_ms / 1000
+
+
+class DeletionScheduler:
+    """Deletes messages at a due time, backed by a persisted min-heap.
+
+    Due times are wall-clock timestamps so pending deletions recovered from
+    the store after a restart keep their schedule. A single worker wakes for
+    the earliest deletion, gathers everything due, and bulk deletes per
+    channel where the bot has Manage Messages.
+    """
+
+    def __init__(self, store, get_channel, batch_window=1.0, max_attempts=3, retry_delay=60.0):
+        self.store = store
+        self.get_channel = get_channel
+        self.batch_window = batch_window
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._heap = []
+        self._attempts = {}
+        self._wakeup = asyncio.Event()
+        self._worker = None
+        self.deleted = 0
+        self.failed = 0
+
+    def __len__(self):
+        return len(self._heap)
+
+    async def start(self):
+        """Recover pending deletions from the store and start the worker."""
+        if self._worker is not None and not self._worker.done():
+            return
+        self._heap = list(await asyncio.to_thread(self.store.all))
+        heapq.heapify(self._heap)
+        if self._heap:
+            logger.info(f"🗑️ Recovered {len(self._heap)} pending message deletions")
+        self._worker = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+
+    async def schedule(self, channel_id, message_id, delay):
+        due_at = time.time() + delay
+        await asyncio.to_thread(self.store.add, message_id, channel_id, due_at)
+        heapq.heappush(self._heap, (due_at, message_id, channel_id))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self._heap:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - time.time()
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            # Gather everything due now (plus a short window) so deletes can be batched
+            cutoff = time.time() + self.batch_window
+            due_by_channel = {}
+            while self._heap and self._heap[0][0] <= cutoff:
+                _, message_id, channel_id = heapq.heappop(self._heap)
+                due_by_channel.setdefault(channel_id, []).append(message_id)
+
+            done = []
+            for channel_id, message_ids in due_by_channel.items():
+                done.extend(await self._delete(channel_id, message_ids))
+            if done:
+                try:
+                    await asyncio.to_thread(self.store.remove_many, done)
+                except Exception as e:
+                    logger.error(f"❌ Error updating pending deletions: {e}")
+
+    async def _delete(self, channel_id, message_ids):
+        """Delete messages in one channel; returns the ids that no longer need deleting."""
+        channel = self.get_channel(channel_id)
+        if channel is None:
+            # Channel is gone (or we lost access): nothing left to clean up
+            return message_ids
+
+        bulk_ids = [mid for mid in message_ids if snowflake_age(mid) < BULK_DELETE_MAX_AGE_SECONDS]
+        guild = getattr(channel, "guild", None)
+        can_bulk = (
+            len(bulk_ids) > 1
+            and guild is not None
+            and hasattr(channel, "delete_messages")
+            and channel.permissions_for(guild.me).manage_messages
+        )
+        done = []
+        if can_bulk:
+            try:
+                for i in range(0, len(bulk_ids), 100):
+                    await channel.delete_messages([channel.get_partial_message(mid) for mid in bulk_ids[i:i + 100]])
+                self.deleted += len(bulk_ids)
+                done.extend(bulk_ids)
+                bulk_done = set(bulk_ids)
+                message_ids = [mid for mid in message_ids if mid not in bulk_done]
+            except Exception as e:
+                logger.warning(f"⚠️ Bulk delete failed in channel {channel_id}, deleting individually: {e}")
+
+        for message_id in message_ids:
+            try:
+                await channel.get_partial_message(message_id).delete()
+                self.deleted += 1
+                self._attempts.pop(message_id, None)
+                done.append(message_id)
+            except Exception as e:
+                if getattr(e, "status", None) in (403, 404):
+                    # Already deleted, or we're not allowed to: retrying won't help
+                    done.append(message_id)
+                    continue
+                attempts = self._attempts.get(message_id, 0) + 1
+                if attempts >= self.max_attempts:
+                    self._attempts.pop(message_id, None)
+                    self.failed += 1
+                    done.append(message_id)
+                    logger.error(f"[Delete error] Giving up on message {message_id}: {e}")
+                else:
+                    self._attempts[message_id] = attempts
+                    heapq.heappush(self._heap, (time.time() + self.retry_delay, message_id, channel_id))
+        return done
@@ -0,0 +1,142 @@
+import re
+
+# Fenced code blocks are kept verbatim and split the text around them
+CODE_BLOCK_PATTERN = re.compile(r"```.*?```", re.DOTALL)
+
+# Inline spans that must not be translated; they are swapped for placeholders
+PROTECTED_PATTERN = re.compile(
+    r"`[^`\n]+`"                        # inline code
+    r"|<a?:\w+:\d+>"                    # custom emoji
+    r"|<@[!&]?\d+>"                     # user and role mentions
+    r"|<#\d+>"                          # channel mentions
+    r"|<t:\d+(?::[tTdDfFR])?>"          # timestamps
+    r"|<?https?://[^\s>]+>?"            # URLs (optionally <suppressed>)
+)
+
+PLACEHOLDER = "⟦{}⟧"
+PLACEHOLDER_PATTERN = re.compile(r"⟦\s*(\d+)\s*⟧")
+
+# Split after sentence punctuation or at line breaks, keeping the separator
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+
+# Chunks with nothing but placeholders, punctuation, digits and whitespace aren't worth a round trip
+NOTHING_TO_TRANSLATE = re.compile(r"^(?:⟦\d+⟧|[\W\d_])*$")
+
+
+class SegmentPlan:
+    """A message split into literal pieces and translatable chunks."""
+
+    def __init__(self, pieces, protected):
+        # pieces: list of (translatable, text); protected: original spans behind placeholders
+        self.pieces = pieces
+        self.protected = protected
+
+    def translatable(self):
+        return [text for translatable, text in self.pieces if translatable]
+
+    def assemble(self, translations):
+        """Rebuild the message from the chunk translations (in translatable() order)."""
+        translations = iter(translations)
+        parts = []
+        for translatable, text in self.pieces:
+            parts.append((next(translations) or text) if translatable else text)
+        return self._unmask("".join(parts))
+
+    def _unmask(self, text):
+        used = set()
+
+        def restore(match):
+            index = int(match.group(1))
+            if index >= len(self.protected):
+                return match.group(0)
+            used.add(index)
+            return self.protected[index]
+
+        text = PLACEHOLDER_PATTERN.sub(restore, text)
+        # Never lose a mention or link because the translator mangled its placeholder
+        missing = [span for i, span in enumerate(self.protected) if i not in used]
+        if missing:
+            text = f"{text} {' '.join(missing)}"
+        return text
+
+
+def _split_long(sentence, max_chars):
+    """Split a sentence longer than max_chars at whitespace (or hard, if there is none)."""
+    chunks = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        chunks.append(sentence[:cut])
+        sentence = sentence[cut:]
+    chunks.append(sentence)
+    return chunks
+
+
+def _chunk_text(text, max_chars, pieces):
+    """Append sentence-aligned chunks of up to max_chars to pieces, keeping separators literal."""
+    position = 0
+    current = ""
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[position:match.start()]
+        separator = match.group(0)
+        position = match.end()
+        # Line breaks end a chunk so the layout of multi-line messages is kept exactly
+        if "\n" in separator:
+            _add_chunk(current + sentence, max_chars, pieces)
+            pieces.append((False, separator))
+            current = ""
+        elif len(current) + len(sentence) + len(separator) > max_chars and current:
+            _add_chunk(current, max_chars, pieces)
+            current = sentence + separator
+        else:
+            current += sentence + separator
+    current += text[position:]
+    _add_chunk(current, max_chars, pieces)
+
+
+def _add_chunk(chunk, max_chars, pieces):
+    if not chunk:
+        return
+    # Keep surrounding whitespace out of the translated text
+    stripped = chunk.strip()
+    leading = chunk[:len(chunk) - len(chunk.lstrip())]
+    trailing = chunk[len(chunk.rstrip()):]
+    if leading:
+        pieces.append((False, leading))
+    if stripped:
+        if NOTHING_TO_TRANSLATE.match(stripped):
+            pieces.append((False, stripped))
+        else:
+            for part in _split_long(stripped, max_chars):
+                word = part.lstrip()
+                if len(word) < len(part):
+                    pieces.append((False, part[:len(part) - len(word)]))
+                pieces.append((True, word))
+    if trailing:
+        pieces.append((False, trailing))
+
+
+def plan_segments(text, max_chars=1500):
+    """Split Discord message text into chunks worth translating.
+
+    Code blocks stay as they are; inline code, mentions, custom emoji,
+    timestamps and URLs are masked with placeholders; the rest is split into
+    sentence-aligned chunks of at most max_chars. Plain short messages come
+    back as a single chunk identical to the input.
+    """
+    protected = []
+
+    def mask(match):
+        protected.append(match.group(0))
+        return PLACEHOLDER.format(len(protected) - 1)
+
+    pieces = []
+    position = 0
+    for block in CODE_BLOCK_PATTERN.finditer(text):
+        _chunk_text(PROTECTED_PATTERN.sub(mask, text[position:block.start()]), max_chars, pieces)
+        pieces.append((False, block.group(0)))
+        position = block.end()
+    _chunk_text(PROTECTED_PATTERN.sub(mask, text[position:]), max_chars, pieces)
+
+    return SegmentPlan(pieces, protected)
@@ -0,0 +1,243 @@
+import logging
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger('discord_translator')
+
+
+def open_database(path):
+    """Open a SQLite database shared between the event loop and worker threads."""
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class TranslationStore:
+    """Persistent translation cache that survives restarts.
+
+    Rows are keyed by the same cache key as the in-memory TranslationCache.
+    compact() keeps the table bounded by dropping the least recently used rows.
+    """
+
+    def __init__(self, path, max_rows=50000):
+        self.path = path
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn = open_database(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " translated TEXT NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT translated FROM translations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE translations SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key, translated):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO translations (key, translated, last_used) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET translated = excluded.translated, last_used = excluded.last_used",
+                (key, translated, time.time())
+            )
+
+    def most_recent(self, limit):
+        """Return the most recently used (key, translated) pairs for warm loading."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT key, translated FROM translations ORDER BY last_used DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def compact(self):
+        """Drop the least recently used rows above max_rows; returns rows removed."""
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            excess = count - self.max_rows
+            if excess <= 0:
+                return 0
+            self._conn.execute(
+                "DELETE FROM translations WHERE key IN ("
+                " SELECT key FROM translations ORDER BY last_used ASC LIMIT ?)",
+                (excess,)
+            )
+            return excess
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class PreferenceStore:
+    """User language preferences with single-row upserts and point lookups."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_database(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS user_languages ("
+            " user_id TEXT PRIMARY KEY,"
+            " lang TEXT NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM user_languages").fetchone()[0]
+
+    def __contains__(self, user_id):
+        return self.get(user_id) is not None
+
+    def get(self, user_id):
+        """Return the user's language code, or None if not configured."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT lang FROM user_languages WHERE user_id = ?", (str(user_id),)
+            ).fetchone()
+            return row[0] if row else None
+
+    def set(self, user_id, lang):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO user_languages (user_id, lang, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(user_id) DO UPDATE SET lang = excluded.lang, updated_at = excluded.updated_at",
+                (str(user_id), lang, time.time())
+            )
+
+    def items(self):
+        with self._lock:
+            return self._conn.execute("SELECT user_id, lang FROM user_languages").fetchall()
+
+    def as_dict(self):
+        return dict(self.items())
+
+    def migrate(self, languages):
+        """One-shot import of a {user_id: lang} dict; skipped if the store already has data."""
+        if not languages or len(self) > 0:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO user_languages (user_id, lang, updated_at) VALUES (?, ?, ?)",
+                [(str(user_id), lang, now) for user_id, lang in languages.items()]
+            )
+            self._conn.execute("COMMIT")
+        return len(languages)
+
+
+class ChannelSettingsStore:
+    """Per-channel switches (currently: whether the bot seeds 🌍 reactions)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_database(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS channel_settings ("
+            " channel_id INTEGER PRIMARY KEY,"
+            " auto_react INTEGER NOT NULL)"
+        )
+
+    def auto_react_overrides(self):
+        """Return {channel_id: enabled} for every channel with an explicit setting."""
+        with self._lock:
+            rows = self._conn.execute("SELECT channel_id, auto_react FROM channel_settings").fetchall()
+        return {channel_id: bool(enabled) for channel_id, enabled in rows}
+
+    def set_auto_react(self, channel_id, enabled):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO channel_settings (channel_id, auto_react) VALUES (?, ?) "
+                "ON CONFLICT(channel_id) DO UPDATE SET auto_react = excluded.auto_react",
+                (int(channel_id), int(enabled))
+            )
+
+
+class DeletionStore:
+    """Pending message deletions, persisted so they survive restarts.
+
+    Each process only recovers rows it owns, so sharded clusters sharing the
+    database don't drop each other's deletions for channels they can't see.
+    """
+
+    def __init__(self, path, owner=0):
+        self.path = path
+        self.owner = owner
+        self._lock = threading.Lock()
+        self._conn = open_database(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_deletions ("
+            " message_id INTEGER PRIMARY KEY,"
+            " channel_id INTEGER NOT NULL,"
+            " due_at REAL NOT NULL,"
+            " owner INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(pending_deletions)")]
+        if "owner" not in columns:
+            self._conn.execute("ALTER TABLE pending_deletions ADD COLUMN owner INTEGER NOT NULL DEFAULT 0")
+
+    def add(self, message_id, channel_id, due_at):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pending_deletions (message_id, channel_id, due_at, owner) VALUES (?, ?, ?, ?)",
+                (message_id, channel_id, due_at, self.owner)
+            )
+
+    def remove_many(self, message_ids):
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM pending_deletions WHERE message_id = ?", [(message_id,) for message_id in message_ids]
+            )
+
+    def all(self):
+        """Return every pending (due_at, message_id, channel_id) owned by this process."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT due_at, message_id, channel_id FROM pending_deletions WHERE owner = ?", (self.owner,)
+            ).fetchall()
+
+
+class MenuStore:
+    """Known language menu message per guild, so startup doesn't have to scan pins."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = open_database(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS guild_menus ("
+            " guild_id INTEGER PRIMARY KEY,"
+            " channel_id INTEGER NOT NULL,"
+            " message_id INTEGER NOT NULL)"
+        )
+
+    def all(self):
+        """Return {guild_id: (channel_id, message_id)}."""
+        with self._lock:
+            rows = self._conn.execute("SELECT guild_id, channel_id, message_id FROM guild_menus").fetchall()
+        return {guild_id: (channel_id, message_id) for guild_id, channel_id, message_id in rows}
+
+    def set(self, guild_id, channel_id, message_id):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO guild_menus (guild_id, channel_id, message_id) VALUES (?, ?, ?)",
+                (guild_id, channel_id, message_id)
+            )
+
+    def remove(self, guild_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM guild_menus WHERE guild_id = ?", (guild_id,))
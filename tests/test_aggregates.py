@@ -0,0 +1,51 @@
+import random
+from collections import Counter, defaultdict
+
+from aggregates import GlobalStats
+from timeseries import TranslationTimeline
+
+
+def guild_stats(per_user, per_language):
+    return {
+        "total": sum(per_language.values()),
+        "per_user": defaultdict(int, per_user),
+        "per_language": Counter(per_language),
+        "timeline": TranslationTimeline(),
+    }
+
+
+def test_rebuild_counts_users_once_across_guilds():
+    stats = GlobalStats.from_stats({
+        1: guild_stats({10: 2, 11: 1}, {"pt": 3}),
+        2: guild_stats({10: 1}, {"es": 1}),
+    })
+    assert stats.total == 4
+    assert stats.unique_users == 2
+    assert stats.top_languages() == [("pt", 3), ("es", 1)]
+
+
+def test_record_keeps_top_k_in_step_with_counts():
+    rng = random.Random(7)
+    stats = GlobalStats(top_k=3)
+    for _ in range(2000):
+        stats.record(rng.randrange(50), rng.choice("abcdefgh"), first_in_guild=False)
+        top = stats.top_languages()
+        counts = [count for _, count in top]
+        assert counts == sorted(counts, reverse=True)
+        assert counts == [count for _, count in stats.per_language.most_common(3)]
+
+
+def test_language_overtakes_the_last_top_entry():
+    stats = GlobalStats(top_k=2)
+    for lang in ["pt", "pt", "pt", "es", "es", "fr", "fr", "fr"]:
+        stats.record(1, lang, first_in_guild=False)
+    assert stats.top_languages() == [("pt", 3), ("fr", 3)]
+
+
+def test_first_in_guild_counts_unique_users():
+    stats = GlobalStats()
+    stats.record(1, "pt", first_in_guild=True)
+    stats.record(1, "pt", first_in_guild=False)
+    stats.record(2, "es", first_in_guild=True)
+    assert stats.unique_users == 2
+    assert stats.total == 3
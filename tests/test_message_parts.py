@@ -0,0 +1,37 @@
+from message_parts import EMBED_LIMITS, clip_text, embed_length, fit_embed
+
+
+def test_clip_text_keeps_within_limit():
+    assert clip_text("short", 10) == "short"
+    clipped = clip_text("x" * 5000, EMBED_LIMITS["description"])
+    assert len(clipped) == EMBED_LIMITS["description"]
+    assert clipped.endswith("…")
+
+
+def test_embed_length_counts_every_text_part():
+    data = {
+        "title": "ab",
+        "description": "cde",
+        "author": {"name": "f"},
+        "footer": {"text": "gh"},
+        "fields": [{"name": "i", "value": "jk"}],
+    }
+    assert embed_length(data) == 11
+
+
+def test_fit_embed_drops_trailing_fields_first():
+    data = {"description": "d" * 10, "fields": [{"name": "a", "value": "b" * 10}, {"name": "c", "value": "e" * 10}]}
+    fitted = fit_embed(data, 25)
+    assert fitted["description"] == data["description"]
+    assert len(fitted["fields"]) == 1
+    assert len(data["fields"]) == 2
+
+
+def test_fit_embed_clips_description():
+    fitted = fit_embed({"title": "t", "description": "d" * 100}, 50)
+    assert embed_length(fitted) <= 50
+    assert fitted["description"].endswith("…")
+
+
+def test_fit_embed_gives_up_when_nothing_fits():
+    assert fit_embed({"title": "t" * 100}, 50) is None
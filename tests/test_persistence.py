@@ -0,0 +1,58 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from persistence import FORMAT_VERSION, PersistenceError, atomic_write_json, read_json
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_round_trip(tmp_path, compress):
+    path = str(tmp_path / "stats.json")
+    atomic_write_json(path, {"1": {"total": 3}}, "translation_stats", compress=compress)
+    assert read_json(path, "translation_stats") == {"1": {"total": 3}}
+    assert os.listdir(tmp_path) == ["stats.json"]
+
+
+def test_legacy_plain_json_is_read_as_is(tmp_path):
+    path = tmp_path / "languages.json"
+    path.write_text(json.dumps({"123": "pt"}))
+    assert read_json(str(path), "languages") == {"123": "pt"}
+
+
+def test_missing_file_raises_file_not_found(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_json(str(tmp_path / "missing.json"), "languages")
+
+
+@pytest.mark.parametrize("raw", [b'{"truncated": ', b"\xff\xfe not utf-8", b"\x1f\x8b not really gzip"])
+def test_corrupted_file_raises_persistence_error(tmp_path, raw):
+    path = tmp_path / "stats.json"
+    path.write_bytes(raw)
+    with pytest.raises(PersistenceError):
+        read_json(str(path), "translation_stats")
+
+
+def test_wrong_kind_is_rejected(tmp_path):
+    path = str(tmp_path / "stats.json")
+    atomic_write_json(path, {}, "languages")
+    with pytest.raises(PersistenceError, match="expected 'translation_stats'"):
+        read_json(path, "translation_stats")
+
+
+def test_newer_format_version_is_rejected(tmp_path):
+    path = tmp_path / "stats.json"
+    payload = {"format": "translation_stats", "version": FORMAT_VERSION + 1, "data": {}}
+    path.write_bytes(gzip.compress(json.dumps(payload).encode("utf-8")))
+    with pytest.raises(PersistenceError, match="newer version"):
+        read_json(str(path), "translation_stats")
+
+
+def test_failed_write_keeps_old_file(tmp_path):
+    path = str(tmp_path / "stats.json")
+    atomic_write_json(path, {"old": 1}, "translation_stats")
+    with pytest.raises(TypeError):
+        atomic_write_json(path, {"new": object()}, "translation_stats")
+    assert read_json(path, "translation_stats") == {"old": 1}
+    assert os.listdir(tmp_path) == ["stats.json"]
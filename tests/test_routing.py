@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import pytest
+
+import routing
+from backends import BackendRegistry, NoBackendAvailable, TranslationBackend
+from routing import BackendRouter, CircuitBreaker
+from translation import TranslationExecutor
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(routing.time, "monotonic", fake)
+    return fake
+
+
+def test_breaker_opens_after_threshold(clock):
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff=5, max_backoff=60)
+    assert breaker.record_failure() is False
+    assert breaker.available()
+    assert breaker.record_failure() is True
+    assert breaker.state == "open"
+    assert not breaker.available()
+
+
+def test_breaker_half_open_allows_one_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=5)
+    breaker.record_failure()
+    clock.now += 5
+    assert breaker.available()
+    breaker.on_request()
+    assert breaker.state == "half_open"
+    assert not breaker.available()
+
+    # A cancelled trial lets the next request try again
+    breaker.release_trial()
+    assert breaker.available()
+
+
+def test_breaker_failed_trial_doubles_backoff(clock):
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=5, max_backoff=15)
+    breaker.record_failure()
+    for expected in (10, 15, 15):
+        clock.now += breaker.backoff
+        breaker.on_request()
+        breaker.record_failure()
+        assert breaker.state == "open"
+        assert breaker.backoff == expected
+        assert not breaker.available()
+
+
+def test_breaker_success_closes_and_resets(clock):
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=5)
+    breaker.record_failure()
+    clock.now += 5
+    breaker.on_request()
+    breaker.record_failure()
+    clock.now += breaker.backoff
+    breaker.on_request()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.backoff == 5
+    assert breaker.failures == 0
+
+
+class TaggedBackend(TranslationBackend):
+    """Answers with its own name after `latency` seconds, or fails."""
+
+    def __init__(self, name, cost, latency=0.0, fail=False):
+        super().__init__()
+        self.name = name
+        self.cost = cost
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def translate(self, text, source, target):
+        self.calls += 1
+        time.sleep(self.latency)
+        if self.fail:
+            raise RuntimeError(f"{self.name} failed")
+        return f"{self.name}:{text}"
+
+
+def make_router(*backends, **options):
+    registry = BackendRegistry()
+    for backend in backends:
+        registry.register(backend)
+    executor = TranslationExecutor(max_workers=4, max_queue=10, timeout=5, backends=registry)
+    results = []
+    options.setdefault("min_hedge_delay", 0.05)
+    options.setdefault("max_hedge_delay", 0.05)
+    router = BackendRouter(executor, on_result=lambda name, result: results.append((name, result)), **options)
+    return router, executor, results
+
+
+def test_hedge_wins_when_primary_is_slow():
+    primary = TaggedBackend("primary", cost=0, latency=0.5)
+    backup = TaggedBackend("backup", cost=1, latency=0.0)
+    router, executor, results = make_router(primary, backup)
+    try:
+        assert asyncio.run(router.translate("hi", "es")) == "backup:hi"
+        assert router.hedges == 1
+        assert ("primary", "hedged") in results
+    finally:
+        executor.shutdown()
+
+
+def test_primary_wins_when_hedge_is_slower():
+    primary = TaggedBackend("primary", cost=0, latency=0.15)
+    backup = TaggedBackend("backup", cost=1, latency=1.0)
+    router, executor, results = make_router(primary, backup)
+    try:
+        assert asyncio.run(router.translate("hi", "es")) == "primary:hi"
+        assert router.hedges == 1
+        assert ("primary", "success") in results
+        # The losing hedge is cancelled, not counted as a failure
+        assert ("backup", "error") not in results
+        assert router.breakers["backup"].failures == 0
+    finally:
+        executor.shutdown()
+
+
+def test_no_hedge_when_primary_answers_in_time():
+    primary = TaggedBackend("primary", cost=0)
+    backup = TaggedBackend("backup", cost=1)
+    router, executor, _ = make_router(primary, backup, min_hedge_delay=1.0, max_hedge_delay=1.0)
+    try:
+        assert asyncio.run(router.translate("hi", "es")) == "primary:hi"
+        assert router.hedges == 0
+        assert backup.calls == 0
+    finally:
+        executor.shutdown()
+
+
+def test_failover_on_error_without_waiting_for_hedge():
+    primary = TaggedBackend("primary", cost=0, fail=True)
+    backup = TaggedBackend("backup", cost=1)
+    router, executor, results = make_router(primary, backup, min_hedge_delay=5.0, max_hedge_delay=5.0)
+    try:
+        started = time.monotonic()
+        assert asyncio.run(router.translate("hi", "es")) == "backup:hi"
+        assert time.monotonic() - started < 1.0
+        assert ("primary", "error") in results
+        assert router.breakers["primary"].failures == 1
+    finally:
+        executor.shutdown()
+
+
+def test_all_backends_failing_raises_last_error():
+    router, executor, _ = make_router(TaggedBackend("a", cost=0, fail=True), TaggedBackend("b", cost=1, fail=True))
+    try:
+        with pytest.raises(RuntimeError, match="b failed"):
+            asyncio.run(router.translate("hi", "es"))
+    finally:
+        executor.shutdown()
+
+
+def test_open_circuits_raise_no_backend_available():
+    only = TaggedBackend("only", cost=0, fail=True)
+    router, executor, _ = make_router(only, failure_threshold=1)
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(router.translate("hi", "es"))
+        with pytest.raises(NoBackendAvailable):
+            asyncio.run(router.translate("hi", "es"))
+        assert only.calls == 1
+    finally:
+        executor.shutdown()
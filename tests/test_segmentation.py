@@ -0,0 +1,62 @@
+from segmentation import plan_segments
+
+MESSAGES = [
+    "Hello world",
+    "Hey <@123>, check https://example.com/a?b=1 now! Also <:pog:9999> is cool.\nSecond line here.",
+    "Before\n\n```py\nprint('hi')\n```\nafter `inline code` and <#42> at <t:1700000000:R>",
+    "One. Two! Three? " * 40,
+    "<@1> <@2>",
+    "😀",
+    "",
+]
+
+
+def test_round_trip_without_translation():
+    for text in MESSAGES:
+        for max_chars in (12, 100, 1500):
+            plan = plan_segments(text, max_chars=max_chars)
+            assert plan.assemble(plan.translatable()) == text
+
+
+def test_short_plain_message_is_one_chunk():
+    plan = plan_segments("Just a normal message.")
+    assert plan.translatable() == ["Just a normal message."]
+
+
+def test_protected_spans_are_masked():
+    text = "ping <@123> see https://example.com and `x = 1` <a:dance:55>"
+    chunks = plan_segments(text).translatable()
+    joined = " ".join(chunks)
+    for span in ("<@123>", "https://example.com", "`x = 1`", "<a:dance:55>"):
+        assert span not in joined
+
+
+def test_code_blocks_are_never_translated():
+    plan = plan_segments("look:\n```\nsome code here\n```\ndone")
+    assert all("some code" not in chunk for chunk in plan.translatable())
+
+
+def test_chunks_respect_max_chars():
+    plan = plan_segments("word " * 500, max_chars=100)
+    assert all(len(chunk) <= 100 for chunk in plan.translatable())
+
+
+def test_only_placeholders_and_punctuation_is_not_sent():
+    assert plan_segments("<@1> <@2>!").translatable() == []
+
+
+def test_placeholders_restored_after_translation():
+    plan = plan_segments("hello <@123>, read https://example.com")
+    translated = [chunk.replace("hello", "hola").replace("read", "lee") for chunk in plan.translatable()]
+    assert plan.assemble(translated) == "hola <@123>, lee https://example.com"
+
+
+def test_placeholder_spacing_mangled_by_translator_is_tolerated():
+    plan = plan_segments("hi <@123> there")
+    translated = [chunk.replace("⟦0⟧", "⟦ 0 ⟧") for chunk in plan.translatable()]
+    assert plan.assemble(translated) == "hi <@123> there"
+
+
+def test_dropped_placeholders_are_appended():
+    plan = plan_segments("hi <@123> there https://example.com")
+    assert plan.assemble(["hola allí"]) == "hola allí <@123> https://example.com"
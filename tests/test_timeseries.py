@@ -0,0 +1,60 @@
+from timeseries import DAY, HOUR, BucketRing, TranslationTimeline
+
+NOW = 1_700_000_000
+
+
+def test_ring_sums_recent_buckets():
+    ring = BucketRing(HOUR, 4)
+    for hours_ago in range(6):
+        ring.add(NOW - hours_ago * HOUR)
+    assert ring.total(1, NOW) == 1
+    assert ring.total(3, NOW) == 3
+    # Only 4 buckets are retained
+    assert ring.total(10, NOW) == 4
+
+
+def test_ring_advancing_clears_reused_slots():
+    ring = BucketRing(HOUR, 4)
+    ring.add(NOW, 5)
+    ring.add(NOW + 2 * HOUR)
+    assert ring.total(4, NOW + 2 * HOUR) == 6
+    ring.add(NOW + 10 * HOUR)
+    assert ring.total(4, NOW + 10 * HOUR) == 1
+
+
+def test_ring_ignores_events_older_than_retention():
+    ring = BucketRing(HOUR, 4)
+    ring.add(NOW)
+    ring.add(NOW - 10 * HOUR)
+    assert ring.total(4, NOW) == 1
+
+
+def test_ring_total_after_quiet_period_is_zero():
+    ring = BucketRing(HOUR, 4)
+    ring.add(NOW)
+    assert ring.total(2, NOW + 5 * HOUR) == 0
+
+
+def test_ring_round_trip_and_resize():
+    ring = BucketRing(HOUR, 4)
+    for hours_ago in range(4):
+        ring.add(NOW - hours_ago * HOUR, hours_ago + 1)
+    same = BucketRing.from_list(HOUR, 4, ring.to_list())
+    assert same.total(4, NOW) == 10
+    smaller = BucketRing.from_list(HOUR, 2, ring.to_list())
+    assert smaller.total(2, NOW) == 1 + 2
+
+
+def test_timeline_periods_and_merge():
+    first = TranslationTimeline()
+    second = TranslationTimeline()
+    for hours_ago in range(48):
+        first.record("pt", NOW - hours_ago * HOUR)
+    second.record("es", NOW - 3 * DAY)
+    assert first.per_language("24h", NOW)["pt"] == 24
+    merged = TranslationTimeline()
+    merged.merge(first)
+    merged.merge(second)
+    assert merged.per_language("7d", NOW) == first.per_language("7d", NOW) + second.per_language("7d", NOW)
+    restored = TranslationTimeline.from_dict(merged.to_dict())
+    assert restored.per_language("30d", NOW) == merged.per_language("30d", NOW)
@@ -0,0 +1,231 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backends import BackendRegistry, MockBackend
+import translation
+from translation import RecentTranslations, SingleFlight, TranslationBatcher, TranslationExecutor, TranslationQueueFull
+
+
+def make_executor(max_workers=2, max_queue=10, timeout=0.5):
+    registry = BackendRegistry()
+    registry.register(MockBackend(latency=0.0))
+    return TranslationExecutor(max_workers=max_workers, max_queue=max_queue, timeout=timeout, backends=registry)
+
+
+def test_executor_counts_calls_until_their_thread_finishes():
+    executor = make_executor(max_workers=1, max_queue=1, timeout=0.05)
+    release = threading.Event()
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await executor.run(release.wait)
+        # The timed-out call still holds the only worker
+        assert executor.queue_depth == 1
+        waiting = asyncio.ensure_future(executor.run(lambda: "done"))
+        await asyncio.sleep(0)
+        assert executor.queue_depth == 2
+        with pytest.raises(TranslationQueueFull):
+            await executor.run(lambda: "rejected")
+        release.set()
+        assert await waiting == "done"
+        await asyncio.sleep(0.01)
+        assert executor.queue_depth == 0
+
+    try:
+        asyncio.run(main())
+    finally:
+        release.set()
+        executor.shutdown()
+
+
+def test_health_check_does_not_wait_behind_translations():
+    executor = make_executor()
+
+    async def main():
+        busy = [asyncio.ensure_future(executor.run(time.sleep, 1)) for _ in range(6)]
+        await asyncio.sleep(0.05)
+        try:
+            return await executor.check_health()
+        finally:
+            for job in busy:
+                job.cancel()
+
+    try:
+        assert asyncio.run(main()) == {"mock": True}
+    finally:
+        executor.shutdown()
+
+
+class RecordingExecutor:
+    """translate_batch() stand-in that records each batch and can fail on some texts."""
+
+    def __init__(self, bad=()):
+        self.bad = set(bad)
+        self.batches = []
+
+    async def translate_batch(self, texts, target, source='auto'):
+        self.batches.append(list(texts))
+        for text in texts:
+            if text in self.bad:
+                raise RuntimeError(f"cannot translate {text}")
+        return [f"{target}:{text}" for text in texts]
+
+
+def test_batcher_only_batches_jobs_of_the_same_group():
+    executor = RecordingExecutor()
+    batcher = TranslationBatcher(executor, window=0.01)
+
+    async def main():
+        return await asyncio.gather(
+            batcher.translate("hola", "en", group="es"),
+            batcher.translate("bonjour", "en", group="fr"),
+            batcher.translate("adiós", "en", group="es"),
+        )
+
+    assert asyncio.run(main()) == ["en:hola", "en:bonjour", "en:adiós"]
+    assert sorted(executor.batches) == [["bonjour"], ["hola", "adiós"]]
+
+
+def test_batcher_retries_failed_batch_one_text_at_a_time():
+    executor = RecordingExecutor(bad={"two"})
+    batcher = TranslationBatcher(executor, window=0.01)
+
+    async def main():
+        return await asyncio.gather(*(batcher.translate(text, "pt") for text in ("one", "two", "three")),
+                                    return_exceptions=True)
+
+    one, two, three = asyncio.run(main())
+    assert (one, three) == ("pt:one", "pt:three")
+    assert isinstance(two, RuntimeError)
+    assert executor.batches[0] == ["one", "two", "three"]
+    assert sorted(executor.batches[1:]) == [["one"], ["three"], ["two"]]
+
+
+def test_batcher_does_not_retry_when_the_queue_is_full():
+    class FullExecutor(RecordingExecutor):
+        async def translate_batch(self, texts, target, source='auto'):
+            self.batches.append(list(texts))
+            raise TranslationQueueFull("busy")
+
+    executor = FullExecutor()
+    batcher = TranslationBatcher(executor, window=0.01)
+
+    async def main():
+        return await asyncio.gather(*(batcher.translate(text, "pt") for text in ("a", "b")), return_exceptions=True)
+
+    assert all(isinstance(result, TranslationQueueFull) for result in asyncio.run(main()))
+    assert len(executor.batches) == 1
+
+
+def test_single_flight_shares_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["result"] * 5
+    assert len(calls) == 1
+    assert flights.coalesced == 4
+    assert len(flights) == 0
+
+
+def test_single_flight_cancelled_waiter_does_not_cancel_others():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "result"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", work))
+        second = asyncio.ensure_future(flights.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "result"
+
+
+def test_single_flight_error_reaches_every_waiter_and_clears_key():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def main():
+        results = await asyncio.gather(*(flights.do("key", fail) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        # A later call starts a fresh flight
+        return await flights.do("key", lambda: asyncio.sleep(0, result="retried"))
+
+    assert asyncio.run(main()) == "retried"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(translation.time, "monotonic", fake)
+    return fake
+
+
+def test_recent_translations_suppresses_repeats_within_window(clock):
+    recent = RecentTranslations(window_seconds=120, buckets=12)
+    assert recent.check_and_add(1, 2) is False
+    assert recent.check_and_add(1, 2) is True
+    assert recent.check_and_add(1, 3) is False
+    assert recent.suppressed == 1
+    clock.now += 60
+    assert recent.check_and_add(1, 2) is True
+
+
+def test_recent_translations_expire_after_window(clock):
+    recent = RecentTranslations(window_seconds=120, buckets=12)
+    recent.check_and_add(1, 2)
+    clock.now += 130
+    assert recent.check_and_add(1, 2) is False
+    clock.now += 10000
+    assert len(recent) == 0
+
+
+def test_recent_translations_discard_allows_retry(clock):
+    recent = RecentTranslations(window_seconds=120, buckets=12)
+    recent.check_and_add(1, 2)
+    clock.now += 30
+    recent.discard(1, 2)
+    assert recent.check_and_add(1, 2) is False
+
+
+def test_recent_translations_stay_within_max_entries(clock):
+    recent = RecentTranslations(window_seconds=120, buckets=12, max_entries=20)
+    for message_id in range(100):
+        recent.check_and_add(message_id, 1)
+        clock.now += 1
+        assert len(recent) <= 20
+    # The newest pairs are the ones kept
+    assert recent.check_and_add(99, 1) is True
+
+
+def test_recent_translations_memory_estimate_grows_per_key(clock):
+    recent = RecentTranslations(window_seconds=120, buckets=12)
+    empty = recent.memory_bytes()
+    for message_id in range(1000):
+        recent.check_and_add(message_id, 1)
+    assert recent.memory_bytes() - empty >= 1000 * translation.KEY_SIZE_BYTES
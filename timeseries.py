@@ -0,0 +1,142 @@
+import time
+from array import array
+from collections import Counter
+
+HOUR = 3600
+DAY = 24 * HOUR
+HOURLY_BUCKETS = 48             # Hourly counts kept (2 days)
+DAILY_BUCKETS = 90              # Daily counts kept (~3 months)
+
+# /stats periods: (bucket resolution, number of buckets including the current one)
+PERIODS = {
+    "24h": (HOUR, 24),
+    "7d": (DAY, 7),
+    "30d": (DAY, 30),
+}
+
+
+class BucketRing:
+    """Fixed-size ring of counters, one per `resolution`-second bucket (UTC aligned).
+
+    Bucket n covers [n * resolution, (n + 1) * resolution). Only the newest
+    len(counts) buckets are kept; advancing the ring zeroes the slots it
+    reuses, so memory never grows.
+    """
+
+    __slots__ = ("resolution", "counts", "head")
+
+    def __init__(self, resolution, size, counts=None, head=None):
+        self.resolution = resolution
+        self.counts = array("I", counts if counts is not None else [0] * size)
+        self.head = head  # newest bucket number written, None while empty
+
+    def _advance(self, bucket):
+        if self.head is None or bucket - self.head >= len(self.counts):
+            for i in range(len(self.counts)):
+                self.counts[i] = 0
+        else:
+            for stale in range(self.head + 1, bucket + 1):
+                self.counts[stale % len(self.counts)] = 0
+        self.head = bucket
+
+    def add(self, timestamp, amount=1):
+        bucket = int(timestamp // self.resolution)
+        if self.head is None or bucket > self.head:
+            self._advance(bucket)
+        elif bucket <= self.head - len(self.counts):
+            return  # Older than the retention window
+        self.counts[bucket % len(self.counts)] += amount
+
+    def total(self, buckets, now):
+        """Sum of the last `buckets` buckets up to and including the one containing `now`."""
+        if self.head is None:
+            return 0
+        current = int(now // self.resolution)
+        start = max(current - buckets + 1, self.head - len(self.counts) + 1)
+        return sum(self.counts[b % len(self.counts)] for b in range(start, min(self.head, current) + 1))
+
+    def to_list(self):
+        return [self.head, list(self.counts)]
+
+    @classmethod
+    def from_list(cls, resolution, size, data):
+        head, counts = data
+        if len(counts) != size:
+            # Retention changed since this was saved: keep what still fits
+            ring = cls(resolution, size)
+            if head is not None:
+                for age in range(min(size, len(counts))):
+                    bucket = head - age
+                    ring.add(bucket * resolution, counts[bucket % len(counts)])
+            return ring
+        return cls(resolution, size, counts, head)
+
+
+class TranslationTimeline:
+    """Per-language translation counts in hourly and daily buckets (one guild, or all of them).
+
+    Each translation is counted in both rings, so "last 24h" is answered from
+    the hourly ring and "last 7d/30d" from the daily one by summing a few
+    array slots, without keeping individual events.
+    """
+
+    def __init__(self):
+        self.languages = {}  # lang -> (hourly ring, daily ring)
+
+    def _rings(self, lang):
+        rings = self.languages.get(lang)
+        if rings is None:
+            rings = self.languages[lang] = (BucketRing(HOUR, HOURLY_BUCKETS), BucketRing(DAY, DAILY_BUCKETS))
+        return rings
+
+    def record(self, lang, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        hourly, daily = self._rings(lang)
+        hourly.add(timestamp)
+        daily.add(timestamp)
+
+    def per_language(self, period, now=None):
+        """Counter of translations per language over a PERIODS key."""
+        now = time.time() if now is None else now
+        resolution, buckets = PERIODS[period]
+        counts = Counter()
+        for lang, (hourly, daily) in self.languages.items():
+            ring = hourly if resolution == HOUR else daily
+            count = ring.total(buckets, now)
+            if count:
+                counts[lang] = count
+        return counts
+
+    def total(self, period, now=None):
+        return sum(self.per_language(period, now).values())
+
+    def prune(self, now=None):
+        """Forget languages with nothing left in the retention window."""
+        now = time.time() if now is None else now
+        for lang in [lang for lang, (_, daily) in self.languages.items() if not daily.total(DAILY_BUCKETS, now)]:
+            del self.languages[lang]
+
+    def merge(self, other):
+        """Add another timeline's counts into this one."""
+        for lang, rings in other.languages.items():
+            for mine, theirs in zip(self._rings(lang), rings):
+                if theirs.head is None:
+                    continue
+                size = len(theirs.counts)
+                for bucket in range(theirs.head - size + 1, theirs.head + 1):
+                    count = theirs.counts[bucket % size]
+                    if count:
+                        mine.add(bucket * theirs.resolution, count)
+
+    def to_dict(self):
+        return {lang: {"hourly": hourly.to_list(), "daily": daily.to_list()} for lang, (hourly, daily) in self.languages.items()}
+
+    @classmethod
+    def from_dict(cls, data):
+        timeline = cls()
+        for lang, rings in (data or {}).items():
+            timeline.languages[lang] = (
+                BucketRing.from_list(HOUR, HOURLY_BUCKETS, rings["hourly"]),
+                BucketRing.from_list(DAY, DAILY_BUCKETS, rings["daily"]),
+            )
+        return timeline
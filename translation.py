@@ -0,0 +1,357 @@
+import asyncio
+import hashlib
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from backends import BackendRegistry, GoogleBackend, NoBackendAvailable
+
+logger = logging.getLogger('discord_translator')
+
+
+class TranslationQueueFull(Exception):
+    """Raised when too many translations are already waiting for a worker."""
+
+
+class TranslationExecutor:
+    """Runs blocking translation calls on a bounded thread pool.
+
+    The event loop only awaits a future, so heartbeats, commands and other
+    reactions keep being served while the HTTP round trip is in progress.
+    """
+
+    def __init__(self, max_workers=8, max_queue=100, timeout=10.0, backends=None):
+        if backends is None:
+            backends = BackendRegistry()
+            backends.register(GoogleBackend())
+        self.backends = backends
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translator")
+        # Health checks get their own thread so they never wait behind queued translations
+        self._health_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-check")
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    @property
+    def queue_depth(self):
+        """Number of calls currently running or waiting for a worker."""
+        return self._pending
+
+    async def run(self, func, *args):
+        """Run a blocking function on the pool with a timeout and queue limit."""
+        if self._pending >= self.max_workers + self.max_queue:
+            raise TranslationQueueFull(f"{self._pending} translations already pending")
+
+        with self._pending_lock:
+            self._pending += 1
+        # Count the call until its thread actually finishes: a timed-out call still occupies a worker
+        future = self._pool.submit(func, *args)
+        future.add_done_callback(self._release)
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.timeout)
+
+    def _release(self, _future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def translate(self, text, target, source='auto'):
+        """Translate text without blocking the event loop."""
+        backend = self.backends.select(source, target)
+        return await self.run(backend.translate, text, source, target)
+
+    async def translate_batch(self, texts, target, source='auto'):
+        """Translate a list of texts into one language."""
+        backend = self.backends.select(source, target)
+        return await self.run_batch(backend, texts, source, target)
+
+    async def run_batch(self, backend, texts, source, target):
+        """Translate texts with one backend, one pool job (and timeout) per request.
+
+        The backend's packs run in parallel on the pool; a pack whose results
+        can't be matched up is retried one text per job.
+        """
+        if len(texts) == 1:
+            return [await self.run(backend.translate, texts[0], source, target)]
+
+        async def run_pack(indices):
+            group = [texts[i] for i in indices]
+            translated = await self.run(backend.translate_pack, group, source, target)
+            if translated is None:
+                translated = await asyncio.gather(*(self.run(backend.translate, text, source, target) for text in group))
+            return translated
+
+        packs = backend.pack(texts)
+        results = [None] * len(texts)
+        for indices, translated in zip(packs, await asyncio.gather(*(run_pack(indices) for indices in packs))):
+            for i, text in zip(indices, translated):
+                results[i] = text
+        return results
+
+    async def check_health(self):
+        """Run every backend's health check; returns {name: healthy}.
+
+        Checks run on a separate one-thread executor, so a busy translation
+        pool can't make them time out and mark working backends unhealthy.
+        """
+        loop = asyncio.get_running_loop()
+        results = {}
+        for backend in self.backends:
+            try:
+                healthy = await asyncio.wait_for(loop.run_in_executor(self._health_pool, backend.health_check), timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ Health check for backend {backend.name} failed: {e}")
+                healthy = False
+            backend.healthy = healthy
+            results[backend.name] = healthy
+        return results
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._health_pool.shutdown(wait=False, cancel_futures=True)
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially different copies share a cache entry."""
+    return " ".join(text.split())
+
+
+def text_digest(text):
+    """Compact hash of the normalized text."""
+    return hashlib.blake2b(normalize_text(text).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def make_cache_key(text, target, source='auto'):
+    """Build a compact cache key from the normalized text hash and language pair."""
+    return f"{source}:{target}:{text_digest(text)}"
+
+
+class TranslationCache:
+    """In-memory LRU cache of translations with size and TTL bounds."""
+
+    def __init__(self, max_entries=5000, ttl_seconds=24 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached translation or None, refreshing its LRU position."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        translated, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.evictions += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return translated
+
+    def put(self, key, translated):
+        self._entries[key] = (translated, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate
+        }
+
+
+class SingleFlight:
+    """Coalesces concurrent calls for the same key into one shared future."""
+
+    def __init__(self):
+        self._inflight = {}
+        self.coalesced = 0
+
+    def __len__(self):
+        return len(self._inflight)
+
+    async def do(self, key, coro_factory):
+        """Await the in-flight call for key, or start one with coro_factory()."""
+        future = self._inflight.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # Shield so one waiter being cancelled doesn't cancel the shared call
+            return await asyncio.shield(future)
+
+        future = asyncio.ensure_future(coro_factory())
+        self._inflight[key] = future
+        future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+
+class TranslationBatcher:
+    """Groups translation jobs for the same language pair into batched calls.
+
+    Jobs are collected for up to `window` seconds (or until `max_batch` jobs
+    are waiting) and then dispatched together through `executor`, which can
+    be a TranslationExecutor or anything with the same translate_batch()
+    coroutine (such as BackendRouter).
+
+    Backends detect one source language per batched request, so with
+    source='auto' callers pass a `group` (such as the detected language) and
+    only jobs with the same group share a batch.
+    """
+
+    def __init__(self, executor, window=0.1, max_batch=25):
+        self.executor = executor
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = {}
+        self._timers = {}
+        self._dispatching = set()
+        self.batches = 0
+        self.jobs = 0
+
+    async def translate(self, text, target, source='auto', group=None):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        group = (source, target, group)
+
+        jobs = self._pending.setdefault(group, [])
+        jobs.append((text, future))
+        if len(jobs) >= self.max_batch:
+            self._flush(group)
+        elif group not in self._timers:
+            self._timers[group] = loop.call_later(self.window, self._flush, group)
+
+        return await future
+
+    def _flush(self, group):
+        timer = self._timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+        jobs = self._pending.pop(group, None)
+        if jobs:
+            task = asyncio.ensure_future(self._dispatch(group, jobs))
+            self._dispatching.add(task)
+            task.add_done_callback(self._dispatching.discard)
+
+    async def _dispatch(self, group, jobs):
+        source, target, _ = group
+        self.batches += 1
+        self.jobs += len(jobs)
+        try:
+            results = await self.executor.translate_batch([text for text, _ in jobs], target, source)
+        except Exception as e:
+            if len(jobs) == 1 or isinstance(e, (TranslationQueueFull, NoBackendAvailable)):
+                # Retrying one by one would only add load (or fail the same way)
+                for _, future in jobs:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            # One bad text shouldn't fail everyone else's translation
+            logger.warning(f"⚠️ Batch of {len(jobs)} translations failed ({e}), retrying one at a time")
+            await asyncio.gather(*(self._dispatch_one(group, text, future) for text, future in jobs))
+            return
+
+        for (_, future), translated in zip(jobs, results):
+            if not future.done():
+                future.set_result(translated)
+
+    async def _dispatch_one(self, group, text, future):
+        source, target, _ = group
+        try:
+            translated = (await self.executor.translate_batch([text], target, source))[0]
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(translated)
+
+
+# Size of one packed (message, user) key: both snowflakes need the full 128 bits
+KEY_SIZE_BYTES = sys.getsizeof((1 << 127) | 1)
+
+
+class RecentTranslations:
+    """Bounded, expiring index of (message, user) pairs translated recently.
+
+    Keys are packed into a single int and kept in a ring of time buckets;
+    whole buckets expire at once, so there is no per-entry bookkeeping.
+    """
+
+    def __init__(self, window_seconds=120, buckets=12, max_entries=100000):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / buckets
+        self.max_entries = max_entries
+        self._buckets = [set() for _ in range(buckets)]
+        self._current = int(time.monotonic() // self.bucket_seconds)
+        self.suppressed = 0
+
+    @staticmethod
+    def make_key(message_id, user_id):
+        # Discord snowflakes fit in 64 bits
+        return (int(message_id) << 64) | int(user_id)
+
+    def _rotate(self):
+        now = int(time.monotonic() // self.bucket_seconds)
+        steps = min(now - self._current, len(self._buckets))
+        for i in range(1, steps + 1):
+            self._buckets[(self._current + i) % len(self._buckets)] = set()
+        self._current = now
+
+    def __len__(self):
+        self._rotate()
+        return sum(len(bucket) for bucket in self._buckets)
+
+    def check_and_add(self, message_id, user_id):
+        """Return True if the pair was seen within the window, otherwise record it."""
+        self._rotate()
+        key = self.make_key(message_id, user_id)
+        if any(key in bucket for bucket in self._buckets):
+            self.suppressed += 1
+            return True
+
+        if len(self) >= self.max_entries:
+            # Over capacity: expire the oldest non-empty bucket early
+            for i in range(1, len(self._buckets) + 1):
+                bucket = self._buckets[(self._current + i) % len(self._buckets)]
+                if bucket:
+                    bucket.clear()
+                    break
+
+        self._buckets[self._current % len(self._buckets)].add(key)
+        return False
+
+    def discard(self, message_id, user_id):
+        """Forget a pair, e.g. when its translation failed and a retry should go through."""
+        key = self.make_key(message_id, user_id)
+        for bucket in self._buckets:
+            bucket.discard(key)
+
+    def memory_bytes(self):
+        """Approximate memory held by the index, without walking its keys."""
+        self._rotate()
+        total = sys.getsizeof(self._buckets)
+        for bucket in self._buckets:
+            total += sys.getsizeof(bucket) + len(bucket) * KEY_SIZE_BYTES
+        return total